@@ -1,15 +1,30 @@
 import gzip
-import json
 import csv
+import functools
+import io
 import logging
+import multiprocessing
+import operator
+import queue
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import ijson
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timezone
 
 # Константы
 INDEX_URL = "https://tech.eaeunion.org/rest-api-data/35-1/"
 TARGET_COUNTRY = "KG"
 OUTPUT_FILE = f"eaeu_archive_export_{TARGET_COUNTRY}.csv"
+DOWNLOAD_WORKERS = 4
+PARSE_WORKERS = 2
+QUEUE_SIZE = 4
+STOP = None
+# Из индексной страницы нужны только ссылки на архивы, DOM не строим
+ARCHIVE_HREF_RE = re.compile(rb'href=["\']([^"\']+\.json\.gz)["\']')
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 logger = logging.getLogger("archive_processor")
@@ -21,35 +36,58 @@ OUTPUT_COLUMNS = [
 ]
 
 COUNTRY_NAMES_RU = {"AM": "Армения", "BY": "Беларусь", "KG": "Кыргызстан", "KZ": "Казахстан", "RU": "Россия"}
+COUNTRY_NAME = COUNTRY_NAMES_RU.get(TARGET_COUNTRY, TARGET_COUNTRY)
 
-def get_nested(obj, path):
-    current = obj
-    for part in path.split("."):
-        if isinstance(current, dict) and part in current:
-            current = current[part]
-        else: return ""
-    return current
+@functools.lru_cache(maxsize=None)
+def compile_path(path):
+    # Путь разбирается один раз в цепочку itemgetter: обход словарей идет в C,
+    # отсутствующий ключ или не-словарь на пути дают исключение и ""
+    getters = tuple(operator.itemgetter(part) for part in path.split("."))
+    def getter(obj):
+        current = obj
+        try:
+            for get in getters:
+                current = get(current)
+        except (KeyError, TypeError):
+            return ""
+        return current
+    return getter
+
+GET_COUNTRY = compile_path("unifiedCountryCode.value")
+GET_STATUS_CODE = compile_path("docStatusDetails.docStatusCode")
+GET_NOTE_TEXT = compile_path("docStatusDetails.noteText")
+GET_APPLICANT = compile_path("applicantDetails.businessEntityName")
+GET_MANUFACTURERS = compile_path("technicalRegulationObjectDetails.manufacturerDetails")
+GET_AUTHORITY = compile_path("conformityAuthorityV2Details.businessEntityName")
+
+EMPTY_TEXTS = frozenset(("None", "nan", "null", "[]", "{}"))
+CLOSED_STATUS_CODES = frozenset(("09", "10"))
+
+def _flatten_list(value):
+    return " | ".join(flatten_for_humans(item) for item in value if item)
+
+def _flatten_dict(value):
+    return "; ".join(f"{k}: {flatten_for_humans(v)}" for k, v in value.items() if v)
+
+# ijson отдает ровно list/dict, поэтому достаточно точного type() без isinstance
+FLATTEN_DISPATCH = {list: _flatten_list, dict: _flatten_dict}
 
 def flatten_for_humans(value):
-    if isinstance(value, list):
-        items = [flatten_for_humans(item) for item in value if item]
-        return " | ".join(items)
-    if isinstance(value, dict):
-        parts = [f"{k}: {flatten_for_humans(v)}" for k, v in value.items() if v]
-        return "; ".join(parts)
+    handler = FLATTEN_DISPATCH.get(type(value))
+    if handler: return handler(value)
     text = str(value).strip()
-    return "" if text in {"None", "nan", "null", "[]", "{}"} else text
+    return "" if text in EMPTY_TEXTS else text
 
 def status_from_record(record):
     # Упрощенная логика статуса для архивов
-    status_code = str(get_nested(record, "docStatusDetails.docStatusCode"))
-    note = str(get_nested(record, "docStatusDetails.noteText")).lower()
-    if "прекращ" in note or status_code in {"09", "10"}: return "прекращен"
+    status_code = str(GET_STATUS_CODE(record))
+    note = str(GET_NOTE_TEXT(record)).lower()
+    if "прекращ" in note or status_code in CLOSED_STATUS_CODES: return "прекращен"
     return "действует" if status_code else "неизвестно"
 
 def record_to_row(record):
-    applicant = flatten_for_humans(get_nested(record, "applicantDetails.businessEntityName"))
-    manuf_list = get_nested(record, "technicalRegulationObjectDetails.manufacturerDetails")
+    applicant = flatten_for_humans(GET_APPLICANT(record))
+    manuf_list = GET_MANUFACTURERS(record)
     manufacturer = ""
     if isinstance(manuf_list, list) and manuf_list:
         manufacturer = flatten_for_humans(manuf_list[0].get("businessEntityName"))
@@ -58,63 +96,130 @@ def record_to_row(record):
     start = flatten_for_humans(record.get("docStartDate", ""))[:10]
     end = flatten_for_humans(record.get("docValidityDate", ""))[:10]
     
-    return {
-        "Регистрационный номер документа": flatten_for_humans(record.get("docId")),
-        "Страна": COUNTRY_NAMES_RU.get(TARGET_COUNTRY, TARGET_COUNTRY),
-        "Вид документа": flatten_for_humans(record.get("conformityDocKindName")),
-        "Срок действия": f"{start} - {end}" if start and end else (start or end),
-        "Заявитель": applicant,
-        "Изготовитель": manufacturer or applicant,
-        "Технический регламент": flatten_for_humans(record.get("technicalRegulationId")),
-        "Наименование органа по оценке соответствия": flatten_for_humans(
-            get_nested(record, "conformityAuthorityV2Details.businessEntityName")
-        ),
-        "Статус действия": status_from_record(record),
-    }
+    # Строка собирается позиционно в порядке OUTPUT_COLUMNS для csv.writer
+    return [
+        flatten_for_humans(record.get("docId")),
+        COUNTRY_NAME,
+        flatten_for_humans(record.get("conformityDocKindName")),
+        f"{start} - {end}" if start and end else (start or end),
+        applicant,
+        manufacturer or applicant,
+        flatten_for_humans(record.get("technicalRegulationId")),
+        flatten_for_humans(GET_AUTHORITY(record)),
+        status_from_record(record),
+    ]
 
-def process_archives():
-    logger.info(f"Сканируем список архивов...")
-    try:
-        r = requests.get(INDEX_URL, timeout=30)
-        r.raise_for_status()
-    except Exception as e:
-        logger.error(f"Не удалось получить список файлов: {e}")
-        return
-
-    soup = BeautifulSoup(r.text, "html.parser")
-    links = [INDEX_URL + a["href"] for a in soup.find_all("a") if a["href"].endswith(".json.gz")]
-    logger.info(f"Найдено файлов: {len(links)}")
-
-    total_kg = 0
-    with open(OUTPUT_FILE, "w", newline="", encoding="utf-8-sig") as f:
-        writer = csv.DictWriter(f, fieldnames=OUTPUT_COLUMNS, delimiter=";")
-        writer.writeheader()
-
-        for i, url in enumerate(links):
-            fname = url.split("/")[-1]
-            logger.info(f"[{i+1}/{len(links)}] Качаем и фильтруем: {fname}")
-            
+def create_http_session():
+    retry = Retry(total=3, backoff_factor=1.0, status_forcelist=[429, 500, 502, 503, 504])
+    # Один пул соединений на все архивы: TLS-рукопожатие только при открытии соединения.
+    # Потоки скачивания только выполняют GET, состояние сессии после создания не меняется
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=DOWNLOAD_WORKERS)
+    session = requests.Session()
+    # Архивы уже сжаты gzip, повторное сжатие ответа не нужно
+    session.headers.update({"Accept-Encoding": "identity"})
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def iter_archive_records(stream):
+    # Корень архива — либо {"result": [...]}, либо сразу массив записей
+    head = stream.peek(64).lstrip()[:1]
+    prefix = "item" if head == b"[" else "result.item"
+    return ijson.items(stream, prefix, use_float=True)
+
+def is_target_country(record):
+    return GET_COUNTRY(record) == TARGET_COUNTRY
+
+def rows_from_archive(body):
+    # В памяти держим только сжатый архив; распаковка и разбор идут потоково,
+    # поэтому одновременно разобрана лишь текущая запись, а страна проверяется
+    # у каждой записи сразу после ее разбора
+    with gzip.GzipFile(fileobj=io.BytesIO(body)) as gz:
+        return list(map(record_to_row, filter(is_target_country, iter_archive_records(gz))))
+
+def download_worker(session, urls, bodies, total):
+    while (task := urls.get()) is not STOP:
+        i, url = task
+        fname = url.split("/")[-1]
+        logger.info(f"[{i+1}/{total}] Качаем: {fname}")
+        try:
+            resp = session.get(url, timeout=60)
+            resp.raise_for_status()
+            bodies.put((fname, resp.content, None))
+        except Exception as e:
+            bodies.put((fname, None, e))
+
+def parse_worker(bodies, batches, parse_pool):
+    # Распаковка и разбор упираются в CPU, поэтому идут в отдельных процессах;
+    # туда уходит только сжатый архив, обратно — строки нужной страны
+    while (task := bodies.get()) is not STOP:
+        fname, body, error = task
+        rows = []
+        if error is None:
             try:
-                # stream=True позволяет не грузить файл в память целиком до распаковки
-                with requests.get(url, stream=True, timeout=60) as resp:
-                    resp.raise_for_status()
-                    # Распаковываем "на лету" из потока
-                    with gzip.GzipFile(fileobj=resp.raw) as gz:
-                        data = json.load(gz)
-                
-                records = data.get("result", []) if isinstance(data, dict) else data
-                count = 0
-                for rec in records:
-                    if get_nested(rec, "unifiedCountryCode.value") == TARGET_COUNTRY:
-                        writer.writerow(record_to_row(rec))
-                        count += 1
-                
-                total_kg += count
-                if count > 0:
-                    logger.info(f"   Найдено в файле: {count} (Всего KG: {total_kg})")
-            
+                rows = parse_pool.submit(rows_from_archive, body).result()
             except Exception as e:
-                logger.error(f"   Ошибка в файле {fname}: {e}")
+                error = e
+        batches.put((fname, rows, error))
+
+def process_archives():
+    logger.info(f"Сканируем список архивов...")
+    # Процессы разбора стартуют лениво, уже при работающих потоках скачивания;
+    # fork многопоточного процесса может унести в потомка захваченные блокировки
+    # (logging, пул urllib3), поэтому процессы запускаются через spawn
+    parse_context = multiprocessing.get_context("spawn")
+    with create_http_session() as session, ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=parse_context) as parse_pool:
+        try:
+            r = session.get(INDEX_URL, timeout=30)
+            r.raise_for_status()
+        except Exception as e:
+            logger.error(f"Не удалось получить список файлов: {e}")
+            return
+
+        links = [INDEX_URL + href.decode() for href in ARCHIVE_HREF_RE.findall(r.content)]
+        logger.info(f"Найдено файлов: {len(links)}")
+
+        # Конвейер: потоки скачивания -> процессы распаковки и разбора -> запись CSV
+        # в этом потоке. Ограниченные очереди дают обратное давление: скачивание
+        # не убегает вперед разбора, а разбор — вперед записи.
+        urls = queue.Queue()
+        for item in enumerate(links):
+            urls.put(item)
+        for _ in range(DOWNLOAD_WORKERS):
+            urls.put(STOP)
+        bodies = queue.Queue(maxsize=QUEUE_SIZE)
+        batches = queue.Queue(maxsize=QUEUE_SIZE)
+        threads = [
+            threading.Thread(target=download_worker, args=(session, urls, bodies, len(links)), daemon=True)
+            for _ in range(DOWNLOAD_WORKERS)
+        ] + [
+            threading.Thread(target=parse_worker, args=(bodies, batches, parse_pool), daemon=True)
+            for _ in range(PARSE_WORKERS)
+        ]
+        for t in threads:
+            t.start()
+
+        total_kg = 0
+        with open(OUTPUT_FILE, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(OUTPUT_COLUMNS)
+
+            # На каждый архив приходит ровно одна пачка (строки или ошибка)
+            for _ in range(len(links)):
+                fname, rows, error = batches.get()
+                if error is not None:
+                    logger.error(f"   Ошибка в файле {fname}: {error}")
+                    continue
+
+                writer.writerows(rows)
+                total_kg += len(rows)
+                if rows:
+                    logger.info(f"   Найдено в файле {fname}: {len(rows)} (Всего KG: {total_kg})")
+
+        for _ in range(PARSE_WORKERS):
+            bodies.put(STOP)
+        for t in threads:
+            t.join()
 
     logger.info(f"ГОТОВО! Файл сохранен: {OUTPUT_FILE}. Найдено записей: {total_kg}")
 
@@ -1,10 +1,16 @@
 import argparse
 import ast
 import csv
-import json
+import functools
+import operator
+import re
+import threading
 import time
+from collections import deque
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
 
+import orjson
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -14,6 +20,7 @@ COLLECTION_NAME = "kbdallread.service-prop-35_1-conformityDocDetailsType"
 VALID_COUNTRY_CODES = ["AM", "BY", "KG", "KZ", "RU"]
 COUNTRY_FIELD = "unifiedCountryCode.value"
 DEFAULT_LIMIT = 10000
+DEFAULT_INFLIGHT = 1
 COUNTRY_NAMES_RU = {
     "AM": "Армения",
     "BY": "Беларусь",
@@ -35,15 +42,35 @@ OUTPUT_COLUMNS = [
 REQUEST_TIMEOUT_SECONDS = 60
 MAX_REQUEST_RETRIES = 6
 RETRY_BACKOFF_SECONDS = 1.0
+CSV_WRITE_BUFFER_BYTES = 4 * 1024 * 1024
+STRUCTURED_CACHE_SIZE = 65536
+# Момент запуска: статус документов считается относительно одной даты на весь прогон.
+NOW_UTC = datetime.now(timezone.utc)
+# ISO-даты сравниваются как строки: лексикографический порядок совпадает с хронологическим.
+NOW_DATE_ISO = NOW_UTC.date().isoformat()
+# Быстрый путь только для заведомо существующих дат: месяц 01-12, день 01-28,
+# дальше конец строки или время. Дни 29-31 и остальное проверяет fromisoformat.
+ISO_DATE_PREFIX_RE = re.compile(r"(\d{4})-(0[1-9]|1[0-2])-(0[1-9]|1\d|2[0-8])(?=$|[T ])")
+EMPTY_TEXTS = frozenset({"None", "nan", "NaN", "null", "[]", "{}"})
+CLOSED_STATUS_CODES = frozenset({"09", "10"})
 
 
 class CsvPartWriter:
-    def __init__(self, filename: str, max_rows_per_file: int, fieldnames: list[str]):
+    def __init__(
+        self,
+        filename: str,
+        max_rows_per_file: int,
+        fieldnames: list[str],
+        flush_each_row: bool = False,
+    ):
         if max_rows_per_file <= 0:
             raise ValueError("--max-rows-per-file должен быть больше 0.")
         self.filename = filename
         self.max_rows_per_file = max_rows_per_file
         self.fieldnames = fieldnames
+        # По умолчанию строки копятся в буфере файла; flush_each_row=True
+        # сбрасывает буфер после каждой записи ценой скорости.
+        self.flush_each_row = flush_each_row
 
         self._file = None
         self._writer = None
@@ -51,6 +78,8 @@ class CsvPartWriter:
         self._part_index = 0
         self.total_rows = 0
         self.files_created: list[str] = []
+        # Страны выгружаются параллельно и пишут в один набор файлов.
+        self._lock = threading.Lock()
 
     def _split_name(self, part_index: int) -> str:
         if "." in self.filename:
@@ -67,9 +96,15 @@ class CsvPartWriter:
         self.close_current()
         self._part_index += 1
         path = self._split_name(self._part_index)
-        self._file = open(path, "w", newline="", encoding="utf-8-sig")
-        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, delimiter=";")
-        self._writer.writeheader()
+        self._file = open(
+            path,
+            "w",
+            newline="",
+            encoding="utf-8-sig",
+            buffering=CSV_WRITE_BUFFER_BYTES,
+        )
+        self._writer = csv.writer(self._file, delimiter=";")
+        self._writer.writerow(self.fieldnames)
         self._rows_in_part = 0
         self.files_created.append(path)
         print(f"Открыт файл: {path}")
@@ -80,23 +115,40 @@ class CsvPartWriter:
         self._file = None
         self._writer = None
 
-    def write_row(self, row: dict[str, str]) -> None:
-        if self._writer is None:
-            self._open_next_file()
-
-        if self._rows_in_part >= self.max_rows_per_file:
-            self._open_next_file()
-
-        self._writer.writerow(row)
-        self._rows_in_part += 1
-        self.total_rows += 1
-
-    def write_rows(self, rows: list[dict[str, str]]) -> None:
-        for row in rows:
-            self.write_row(row)
+    def write_row(self, row: list[str]) -> None:
+        with self._lock:
+            if self._writer is None:
+                self._open_next_file()
+
+            if self._rows_in_part >= self.max_rows_per_file:
+                self._open_next_file()
+
+            self._writer.writerow(row)
+            self._rows_in_part += 1
+            self.total_rows += 1
+            if self.flush_each_row:
+                self._file.flush()
+
+    def write_rows(self, rows: list[list[str]]) -> None:
+        with self._lock:
+            offset = 0
+            while offset < len(rows):
+                if self._writer is None or self._rows_in_part >= self.max_rows_per_file:
+                    self._open_next_file()
+
+                # Пишем одним вызовом writerows кусок до границы текущего файла.
+                chunk = rows[offset : offset + self.max_rows_per_file - self._rows_in_part]
+                self._writer.writerows(chunk)
+                self._rows_in_part += len(chunk)
+                self.total_rows += len(chunk)
+                offset += len(chunk)
+
+            if self.flush_each_row and self._file is not None:
+                self._file.flush()
 
     def close(self) -> None:
-        self.close_current()
+        with self._lock:
+            self.close_current()
 
 
 def parse_args() -> argparse.Namespace:
@@ -124,6 +176,15 @@ def parse_args() -> argparse.Namespace:
         default=1.0,
         help="Пауза между запросами в секундах (по умолчанию 1.0).",
     )
+    parser.add_argument(
+        "--inflight",
+        type=int,
+        default=DEFAULT_INFLIGHT,
+        help=(
+            "Сколько страниц одной страны запрашивать одновременно "
+            f"(по умолчанию {DEFAULT_INFLIGHT} — последовательно)."
+        ),
+    )
     parser.add_argument(
         "--output",
         type=str,
@@ -139,7 +200,7 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def create_http_session() -> requests.Session:
+def create_http_session(pool_size: int = 1) -> requests.Session:
     retry = Retry(
         total=MAX_REQUEST_RETRIES,
         connect=MAX_REQUEST_RETRIES,
@@ -149,8 +210,12 @@ def create_http_session() -> requests.Session:
         allowed_methods=frozenset({"POST"}),
         raise_on_status=False,
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    # Соединений в пуле не меньше, чем одновременных запросов: иначе лишние
+    # соединения закрываются после ответа и TLS-рукопожатие повторяется.
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=pool_size)
     session = requests.Session()
+    # Пачки до 10000 записей в JSON сжимаются в разы; requests распаковывает ответ сам.
+    session.headers.update({"Accept-Encoding": "gzip, deflate", "Content-Type": "text/plain"})
     session.mount("https://", adapter)
     session.mount("http://", adapter)
     return session
@@ -214,15 +279,25 @@ def parse_structured_value(value):
         return value
 
     text = value.strip()
-    if not text or text in {"[]", "{}", "None", "nan", "NaN", "null"}:
+    if not text or text in EMPTY_TEXTS:
         return ""
 
     if (text.startswith("[") and text.endswith("]")) or (
         text.startswith("{") and text.endswith("}")
     ):
         try:
-            return json.loads(text)
-        except json.JSONDecodeError:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+        # ast нужен только для repr Python-объектов со строками в одинарных
+        # кавычках; остальной невалидный JSON сразу возвращаем как есть.
+        if "'" not in text:
+            return value
+        # Обычно repr отличается от JSON только кавычками; None/True/False и
+        # апострофы внутри значений остаются для ast.
+        try:
+            return orjson.loads(text.replace("'", '"'))
+        except orjson.JSONDecodeError:
             pass
         try:
             return ast.literal_eval(text)
@@ -233,57 +308,73 @@ def parse_structured_value(value):
 
 
 def flatten_for_humans(value) -> str:
+    # Части собираются генераторами прямо в join, без промежуточных списков.
     if isinstance(value, list):
-        if not value:
-            return ""
-        items = [flatten_for_humans(item) for item in value]
-        items = [item for item in items if item]
-        return " | ".join(items)
+        return " | ".join(item for item in map(flatten_for_humans, value) if item)
 
     if isinstance(value, dict):
-        parts = []
-        for key, raw in value.items():
-            flat = flatten_for_humans(raw)
-            if flat:
-                parts.append(f"{key}: {flat}")
-        return "; ".join(parts)
+        return "; ".join(
+            f"{key}: {flat}" for key, raw in value.items() if (flat := flatten_for_humans(raw))
+        )
 
     text = str(value).strip() if value is not None else ""
-    if text in {"None", "nan", "NaN", "null", "[]", "{}"}:
-        return ""
-    return text
+    return "" if text in EMPTY_TEXTS else text
 
 
-def get_nested(obj: dict, path: str, default=""):
-    current = obj
-    for part in path.split("."):
-        if isinstance(current, dict) and part in current:
-            current = current[part]
-        else:
+@functools.lru_cache(maxsize=None)
+def compile_path(path: str):
+    getters = tuple(operator.itemgetter(part) for part in path.split("."))
+
+    # Путь разбирается один раз; геттер сначала проверяет плоский ключ
+    # ("a.b" целиком), затем обходит вложенные словари цепочкой itemgetter.
+    # Отсутствующий ключ или не-словарь на пути дают default.
+    def getter(record: dict, default=""):
+        if path in record:
+            return record.get(path, default)
+        current = record
+        try:
+            for get in getters:
+                current = get(current)
+        except (KeyError, TypeError):
             return default
-    return current
+        return current
 
+    return getter
 
-def get_value(record: dict, path: str, default=""):
-    if path in record:
-        return record.get(path, default)
-    return get_nested(record, path, default)
 
+def compile_date_path(field_name: str):
+    get_direct = compile_path(field_name)
+    get_dotted = compile_path(f"{field_name}.$date")
 
-def get_date_value(record: dict, field_name: str):
-    direct = get_value(record, field_name, "")
-    if isinstance(direct, dict):
-        nested = direct.get("$date", "")
-        if nested:
-            return nested
-    if direct:
-        return direct
+    def getter(record: dict):
+        direct = get_direct(record, "")
+        if isinstance(direct, dict):
+            nested = direct.get("$date", "")
+            if nested:
+                return nested
+        if direct:
+            return direct
 
-    dotted = get_value(record, f"{field_name}.$date", "")
-    if dotted:
-        return dotted
+        dotted = get_dotted(record, "")
+        if dotted:
+            return dotted
 
-    return ""
+        return ""
+
+    return getter
+
+
+GET_COUNTRY = compile_path(COUNTRY_FIELD)
+GET_DOC_ID = compile_path("docId")
+GET_DOC_KIND = compile_path("conformityDocKindName")
+GET_APPLICANT = compile_path("applicantDetails.businessEntityName")
+GET_MANUFACTURERS = compile_path("technicalRegulationObjectDetails.manufacturerDetails")
+GET_REGULATION = compile_path("technicalRegulationId")
+GET_AUTHORITY = compile_path("conformityAuthorityV2Details.businessEntityName")
+GET_STATUS_CODE = compile_path("docStatusDetails.docStatusCode")
+GET_NOTE_TEXT = compile_path("docStatusDetails.noteText")
+GET_START_DATE = compile_date_path("docStartDate")
+GET_VALIDITY_DATE = compile_date_path("docValidityDate")
 
 
 def normalize_record(item: object, country_code: str) -> dict:
@@ -294,15 +385,15 @@ def normalize_record(item: object, country_code: str) -> dict:
         parsed = None
         if stripped:
             try:
-                parsed = json.loads(stripped)
-            except json.JSONDecodeError:
+                parsed = orjson.loads(stripped)
+            except orjson.JSONDecodeError:
                 parsed = None
         if isinstance(parsed, dict):
             row = parsed
         else:
             row = {"_raw_value": item, "_raw_type": "str"}
     elif isinstance(item, list):
-        row = {"_raw_value": json.dumps(item, ensure_ascii=False), "_raw_type": "list"}
+        row = {"_raw_value": orjson.dumps(item).decode(), "_raw_type": "list"}
     else:
         row = {"_raw_value": item, "_raw_type": type(item).__name__}
 
@@ -315,6 +406,9 @@ def to_ddmmyyyy(value) -> str:
     text = flatten_for_humans(value).strip()
     if not text:
         return ""
+    match = ISO_DATE_PREFIX_RE.match(text)
+    if match:
+        return f"{match[3]}.{match[2]}.{match[1]}"
     try:
         dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
         return dt.strftime("%d.%m.%Y")
@@ -323,7 +417,30 @@ def to_ddmmyyyy(value) -> str:
 
 
 def extract_from_structured(value, key: str) -> str:
-    parsed = parse_structured_value(value)
+    if isinstance(value, str):
+        return extract_from_structured_text(value, key)
+    return extract_from_parsed(parse_structured_value(value), key)
+
+
+# Одни и те же изготовители и регламенты повторяются в тысячах записей: если поле
+# пришло строкой, разбираем каждое уникальное значение один раз.
+@functools.lru_cache(maxsize=STRUCTURED_CACHE_SIZE)
+def extract_from_structured_text(text: str, key: str) -> str:
+    return extract_from_parsed(parse_structured_value(text), key)
+
+
+@functools.lru_cache(maxsize=STRUCTURED_CACHE_SIZE)
+def structured_text_for_humans(text: str) -> str:
+    return flatten_for_humans(parse_structured_value(text))
+
+
+def structured_for_humans(value) -> str:
+    if isinstance(value, str):
+        return structured_text_for_humans(value)
+    return flatten_for_humans(parse_structured_value(value))
+
+
+def extract_from_parsed(parsed, key: str) -> str:
     if isinstance(parsed, dict):
         return flatten_for_humans(parsed.get(key, ""))
     if isinstance(parsed, list):
@@ -338,61 +455,63 @@ def extract_from_structured(value, key: str) -> str:
     return ""
 
 
+def scalar_text(value) -> str:
+    if isinstance(value, str):
+        text = value.strip()
+        return "" if text in EMPTY_TEXTS else text
+    return flatten_for_humans(value).strip()
+
+
+def iso_date_prefix(text: str) -> str:
+    # Сервер отдает даты как YYYY-MM-DDTHH:MM:SS[.fff]Z — хватает первых 10 символов.
+    if ISO_DATE_PREFIX_RE.match(text):
+        return text[:10]
+    return datetime.fromisoformat(text.replace("Z", "+00:00")).date().isoformat()
+
+
 def status_from_record(record: dict) -> str:
-    end_date_raw = get_date_value(record, "docValidityDate")
-    status_code = flatten_for_humans(get_value(record, "docStatusDetails.docStatusCode", "")).strip()
-    note_text = flatten_for_humans(get_value(record, "docStatusDetails.noteText", "")).strip().lower()
+    end_date_raw = GET_VALIDITY_DATE(record)
+    status_code = scalar_text(GET_STATUS_CODE(record))
+    note_text = scalar_text(GET_NOTE_TEXT(record)).lower()
 
-    end_text = flatten_for_humans(end_date_raw).strip()
+    end_text = scalar_text(end_date_raw)
     if end_text:
         try:
-            end_dt = datetime.fromisoformat(end_text.replace("Z", "+00:00"))
-            now = datetime.now(timezone.utc)
-            if end_dt.tzinfo is None:
-                end_dt = end_dt.replace(tzinfo=timezone.utc)
-            return "действует" if end_dt >= now else "прекращен"
+            return "действует" if iso_date_prefix(end_text) >= NOW_DATE_ISO else "прекращен"
         except ValueError:
             pass
 
     if "прекращ" in note_text:
         return "прекращен"
-    if status_code in {"09", "10"}:
+    if status_code in CLOSED_STATUS_CODES:
         return "прекращен"
     if status_code:
         return "действует"
     return ""
 
 
-def record_to_selected_row(record: dict) -> dict[str, str]:
-    country_code = flatten_for_humans(get_value(record, COUNTRY_FIELD, "")).strip()
+def record_to_selected_row(record: dict) -> list[str]:
+    # Строка собирается позиционно в порядке OUTPUT_COLUMNS для csv.writer.
+    # Скалярные строки идут через scalar_text без рекурсии; списки и словари
+    # разворачиваются только в колонках, где они реально встречаются.
+    country_code = scalar_text(GET_COUNTRY(record))
+    applicant = scalar_text(GET_APPLICANT(record))
+    manufacturer = extract_from_structured(GET_MANUFACTURERS(record), "businessEntityName")
 
-    applicant = flatten_for_humans(get_value(record, "applicantDetails.businessEntityName", ""))
-    manufacturer = extract_from_structured(
-        get_value(record, "technicalRegulationObjectDetails.manufacturerDetails", ""),
-        "businessEntityName",
-    )
-    if not manufacturer:
-        manufacturer = applicant
-
-    start = to_ddmmyyyy(get_date_value(record, "docStartDate"))
-    end = to_ddmmyyyy(get_date_value(record, "docValidityDate"))
-    term = f"{start} - {end}" if start and end else (start or end)
-
-    return {
-        "Регистрационный номер документа": flatten_for_humans(get_value(record, "docId", "")),
-        "Страна": COUNTRY_NAMES_RU.get(country_code, country_code),
-        "Вид документа": flatten_for_humans(get_value(record, "conformityDocKindName", "")),
-        "Срок действия": term,
-        "Заявитель": applicant,
-        "Изготовитель": manufacturer,
-        "Технический регламент": flatten_for_humans(
-            parse_structured_value(get_value(record, "technicalRegulationId", ""))
-        ),
-        "Наименование органа по оценке соответствия": flatten_for_humans(
-            get_value(record, "conformityAuthorityV2Details.businessEntityName", "")
-        ),
-        "Статус действия": status_from_record(record),
-    }
+    start = to_ddmmyyyy(GET_START_DATE(record))
+    end = to_ddmmyyyy(GET_VALIDITY_DATE(record))
+
+    return [
+        scalar_text(GET_DOC_ID(record)),
+        COUNTRY_NAMES_RU.get(country_code, country_code),
+        scalar_text(GET_DOC_KIND(record)),
+        f"{start} - {end}" if start and end else (start or end),
+        applicant,
+        manufacturer or applicant,
+        structured_for_humans(GET_REGULATION(record)),
+        scalar_text(GET_AUTHORITY(record)),
+        status_from_record(record),
+    ]
 
 
 def extract_rest_data(payload: object) -> list[object]:
@@ -404,13 +523,9 @@ def extract_rest_data(payload: object) -> list[object]:
     return [payload]
 
 
-def fetch_batch(
-    session: requests.Session,
-    country_code: str,
-    limit: int,
-    skip: int,
-) -> list[object]:
-    headers = {"Content-Type": "text/plain"}
+@functools.lru_cache(maxsize=None)
+def country_query_payload(country_code: str) -> bytes:
+    # Тело запроса зависит только от страны — сериализуем его один раз.
     query_payload = {
         "$and": [
             {
@@ -420,15 +535,30 @@ def fetch_batch(
             }
         ]
     }
+    return orjson.dumps(query_payload)
+
+
+def fetch_batch(
+    session: requests.Session,
+    country_code: str,
+    limit: int,
+    skip: int,
+) -> list[object]:
     url = f"{BASE_URL}?collection={COLLECTION_NAME}&limit={limit}&skip={skip}"
     response = session.post(
         url,
-        headers=headers,
-        data=json.dumps(query_payload),
+        data=country_query_payload(country_code),
         timeout=REQUEST_TIMEOUT_SECONDS,
     )
     response.raise_for_status()
-    return extract_rest_data(response.json())
+    try:
+        payload = orjson.loads(response.content)
+    except orjson.JSONDecodeError as exc:
+        # Как и response.json(): битый ответ считаем сетевой ошибкой и повторяем.
+        raise requests.exceptions.InvalidJSONError(
+            f"Некорректный JSON в ответе: {exc}", response=response
+        ) from exc
+    return extract_rest_data(payload)
 
 
 def stream_country(
@@ -437,64 +567,113 @@ def stream_country(
     limit: int,
     sleep_seconds: float,
     writer: CsvPartWriter,
+    stop_event: threading.Event | None = None,
+    inflight: int = DEFAULT_INFLIGHT,
 ) -> int:
     total_written = 0
     skip = 0
     batch_count = 1
     server_page_cap_detected = False
+    # После первой неполной пачки запрашиваем ровно столько, сколько сервер реально отдает.
+    effective_limit = limit
+    # Окно запросов: следующие страницы запрашиваются заранее по предполагаемому skip,
+    # а обрабатываются строго по порядку. Если пачка пришла неполной, предсказанные
+    # смещения неверны — такие запросы отбрасываются и окно строится заново.
+    pending: deque[tuple[int, Future]] = deque()
+
+    def submit(page_skip: int) -> None:
+        pending.append(
+            (page_skip, pool.submit(fetch_batch, session, country_code, effective_limit, page_skip))
+        )
 
-    print(f"\nСтарт выгрузки страны {country_code} (limit={limit})")
-
-    while True:
-        try:
-            data = fetch_batch(session, country_code, limit, skip)
-        except requests.RequestException as exc:
-            print(
-                f"{country_code}: ошибка сети на skip={skip}: {exc}. "
-                "Повторю через паузу."
-            )
-            time.sleep(max(2.0, sleep_seconds))
-            continue
-
-        if not data:
-            print(f"{country_code}: данные закончились.")
-            break
+    def discard_pending() -> None:
+        while pending:
+            pending.popleft()[1].cancel()
 
-        rows = []
-        for item in data:
-            record = normalize_record(item, country_code)
-            rows.append(record_to_selected_row(record))
+    print(f"\nСтарт выгрузки страны {country_code} (limit={limit}, inflight={inflight})")
 
-        if rows:
-            writer.write_rows(rows)
-            total_written += len(rows)
+    pool = ThreadPoolExecutor(max_workers=inflight)
+    try:
+        while stop_event is None or not stop_event.is_set():
+            next_skip = pending[-1][0] + effective_limit if pending else skip
+            while len(pending) < inflight:
+                submit(next_skip)
+                next_skip += effective_limit
 
-        print(
-            f"{country_code} | пачка #{batch_count}: получено {len(data)} записей "
-            f"(skip={skip}), записано {len(rows)}"
-        )
+            page_skip, future = pending.popleft()
+            try:
+                data = future.result()
+            except requests.RequestException as exc:
+                print(
+                    f"{country_code}: ошибка сети на skip={page_skip}: {exc}. "
+                    "Повторю через паузу."
+                )
+                discard_pending()
+                time.sleep(max(2.0, sleep_seconds))
+                continue
+
+            if not data:
+                print(f"{country_code}: данные закончились.")
+                break
+
+            rows = []
+            for item in data:
+                record = normalize_record(item, country_code)
+                rows.append(record_to_selected_row(record))
+
+            if rows:
+                writer.write_rows(rows)
+                total_written += len(rows)
 
-        if len(data) < limit and not server_page_cap_detected:
             print(
-                f"{country_code}: сервер вернул {len(data)} < limit={limit}. "
-                "Продолжаю пагинацию до пустого ответа."
+                f"{country_code} | пачка #{batch_count}: получено {len(data)} записей "
+                f"(skip={page_skip}), записано {len(rows)}"
             )
-            server_page_cap_detected = True
 
-        skip += len(data)
-        batch_count += 1
-        if sleep_seconds > 0:
-            time.sleep(sleep_seconds)
+            if len(data) < limit and not server_page_cap_detected:
+                print(
+                    f"{country_code}: сервер вернул {len(data)} < limit={limit}. "
+                    f"Дальше запрашиваю по {len(data)} и продолжаю пагинацию до пустого ответа."
+                )
+                server_page_cap_detected = True
+                effective_limit = len(data)
+
+            skip = page_skip + len(data)
+            if len(data) != effective_limit or (pending and pending[0][0] != skip):
+                discard_pending()
+            batch_count += 1
+            if sleep_seconds > 0:
+                time.sleep(sleep_seconds)
+    finally:
+        discard_pending()
+        pool.shutdown(wait=True)
 
     print(f"{country_code}: всего записано {total_written} строк.")
     return total_written
 
 
+def sum_until_first_error(futures: list[Future], stop_event: threading.Event) -> int:
+    # Ждем не в порядке отправки: ошибка любого потока сразу останавливает
+    # остальные на следующей странице, а еще не начатые задачи отменяются.
+    try:
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in done:
+            future.result()
+    except BaseException:
+        stop_event.set()
+        for future in futures:
+            future.cancel()
+        raise
+    return sum(future.result() for future in futures)
+
+
 def main() -> None:
     args = parse_args()
 
     if args.limit <= 0:
         raise ValueError("--limit должен быть больше 0.")
+    if args.inflight <= 0:
+        raise ValueError("--inflight должен быть больше 0.")
 
     if not args.countries.strip() or args.countries.upper() == "ASK":
         countries = ask_countries_interactive()
@@ -505,21 +684,31 @@ def main() -> None:
 
     filename = output_name(countries, args.output)
     writer = CsvPartWriter(filename, args.max_rows_per_file, OUTPUT_COLUMNS)
-    session = create_http_session()
-
+    # Страны независимы: каждая идет своим потоком со своей паузой --sleep
+    # и своей сессией, пул соединений потоки не делят.
+    sessions = [create_http_session(pool_size=args.inflight) for _ in countries]
+    stop_event = threading.Event()
     total = 0
     try:
-        for country in countries:
-            total += stream_country(
-                session=session,
-                country_code=country,
-                limit=args.limit,
-                sleep_seconds=args.sleep,
-                writer=writer,
-            )
+        with ThreadPoolExecutor(max_workers=len(countries)) as pool:
+            futures = [
+                pool.submit(
+                    stream_country,
+                    session=session,
+                    country_code=country,
+                    limit=args.limit,
+                    sleep_seconds=args.sleep,
+                    writer=writer,
+                    stop_event=stop_event,
+                    inflight=args.inflight,
+                )
+                for country, session in zip(countries, sessions)
+            ]
+            total = sum_until_first_error(futures, stop_event)
     finally:
         writer.close()
-        session.close()
+        for session in sessions:
+            session.close()
 
     if total == 0:
         print("Данные не получены.")
@@ -1,13 +1,23 @@
 import argparse
 import ast
-import csv
+import codecs
+import functools
+import gzip
 import json
 import logging
 import os
+import queue
 import random
+import re
+import threading
 import time
+from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode
 
+import orjson
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -40,26 +50,73 @@ DEFAULT_USER_AGENT = (
     "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
 )
 RETRY_BACKOFF_SECONDS = 1.0
+BATCH_BACKOFF_BASE_SECONDS = 0.5
+BATCH_BACKOFF_CAP_SECONDS = 30.0
 MAX_CONSECUTIVE_BATCH_ERRORS = 8
 LOG_FORMAT = "%(asctime)s | %(levelname)s | %(message)s"
 LOGGER = logging.getLogger("eaeu_odata_export")
 DEFAULT_STATE_FILE = ".eaeu_export_state.json"
+CSV_WRITE_BUFFER_BYTES = 4 * 1024 * 1024
+CSV_PENDING_ROWS = 1000
+DATE_CACHE_SIZE = 65536
+CLOSED_STATUS_CODES = frozenset({"09", "10"})
+UTC_TIMESTAMP_RE = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?Z$")
+EMPTY_TEXTS = frozenset({"None", "nan", "NaN", "null", "[]", "{}"})
+DEFAULT_INFLIGHT = 1
+DEFAULT_WORKERS = 1
+COMPRESS_MODES = ("none", "gzip")
+# Уровень 1: CSV с повторяющимися странами и датами и так сжимается в разы,
+# а на сжатие уходит заметно меньше CPU, чем на уровнях по умолчанию.
+GZIP_COMPRESS_LEVEL = 1
+DEFAULT_LIMIT = 1000
+ADAPTIVE_MIN_TOP = 50
+ADAPTIVE_FAST_RESPONSE_SECONDS = 2.0
+PAGINATION_MODES = ("skip", "keyset")
+SKIP_ORDER_BY = "docCreationDate desc"
+KEYSET_ORDER_BY = "docCreationDate desc,docId desc"
+STATE_FLUSH_SECONDS = 5.0
+STATE_FLUSH_EVERY_BATCHES = 10
+
+
+def escape_csv_field(value: str) -> str:
+    # Как csv.QUOTE_MINIMAL: в кавычки берем только поля с разделителем,
+    # кавычкой или переводом строки.
+    if ";" in value or '"' in value or "\n" in value or "\r" in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
 
 
 class CsvPartWriter:
-    def __init__(self, filename: str, max_rows_per_file: int, fieldnames: list[str]):
+    def __init__(
+        self,
+        filename: str,
+        max_rows_per_file: int,
+        fieldnames: list[str],
+        flush_each_row: bool = False,
+        compress: str = "none",
+    ):
         if max_rows_per_file <= 0:
             raise ValueError("--max-rows-per-file должен быть больше 0.")
+        if compress not in COMPRESS_MODES:
+            raise ValueError("--compress должен быть none или gzip.")
         self.filename = filename
+        self.compress = compress
         self.max_rows_per_file = max_rows_per_file
         self.fieldnames = fieldnames
+        # По умолчанию строки копятся в буфере файла; flush_each_row=True
+        # сбрасывает буфер после каждой записи ценой скорости.
+        self.flush_each_row = flush_each_row
 
         self._file = None
-        self._writer = None
+        self._raw_file = None
+        # Закодированные строки копятся здесь и пишутся в файл одним write.
+        self._pending: list[str] = []
         self._rows_in_part = 0
         self._part_index = 0
         self.total_rows = 0
         self.files_created: list[str] = []
+        # При --workers > 1 интервалы выгружаются параллельно и пишут в один набор файлов.
+        self._lock = threading.Lock()
 
     def _split_name(self, part_index: int) -> str:
         if "." in self.filename:
@@ -72,40 +129,115 @@ class CsvPartWriter:
             return self.filename
         return f"{base}_part{part_index:03d}{ext}"
 
+    def _encode_row(self, row: list[str]) -> str:
+        # Строка — значения в порядке fieldnames, без поиска по именам колонок.
+        line = ";".join(row)
+        # Почти все строки экранировать не нужно: проверяем строку целиком за
+        # несколько проходов в C. Лишний ";" или кавычка — разбор по полям.
+        if (
+            line.count(";") == len(row) - 1
+            and '"' not in line
+            and "\n" not in line
+            and "\r" not in line
+        ):
+            return line + "\r\n"
+        return ";".join([escape_csv_field(value) for value in row]) + "\r\n"
+
     def _open_next_file(self) -> None:
         self.close_current()
         self._part_index += 1
         path = self._split_name(self._part_index)
-        self._file = open(path, "w", newline="", encoding="utf-8-sig")
-        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, delimiter=";")
-        self._writer.writeheader()
+        if self.compress == "gzip":
+            path += ".gz"
+        # Файл открыт в двоичном режиме: строки уже собраны с \r\n, и пачка
+        # кодируется одним encode без текстовой обертки над буфером.
+        self._raw_file = open(path, "wb", buffering=CSV_WRITE_BUFFER_BYTES)
+        if self.compress == "gzip":
+            self._file = gzip.GzipFile(
+                fileobj=self._raw_file,
+                mode="wb",
+                compresslevel=GZIP_COMPRESS_LEVEL,
+            )
+        else:
+            self._file = self._raw_file
+        header = ";".join([escape_csv_field(name) for name in self.fieldnames]) + "\r\n"
+        self._file.write(codecs.BOM_UTF8 + header.encode("utf-8"))
         self._rows_in_part = 0
         self.files_created.append(path)
         print(f"Открыт файл: {path}")
 
+    def _flush_pending(self) -> None:
+        if self._pending:
+            self._file.write("".join(self._pending).encode("utf-8"))
+            self._pending.clear()
+
     def close_current(self) -> None:
         if self._file is not None:
-            self._file.close()
+            self._flush_pending()
+            if self._file is not self._raw_file:
+                # Закрытие GzipFile дописывает хвост архива в файл под ним.
+                self._file.close()
+            # Закрытая часть должна лежать на диске до того, как state уйдет дальше.
+            self._raw_file.flush()
+            os.fsync(self._raw_file.fileno())
+            self._raw_file.close()
         self._file = None
-        self._writer = None
-
-    def write_row(self, row: dict[str, str]) -> None:
-        if self._writer is None:
-            self._open_next_file()
-
-        if self._rows_in_part >= self.max_rows_per_file:
-            self._open_next_file()
-
-        self._writer.writerow(row)
-        self._rows_in_part += 1
-        self.total_rows += 1
-
-    def write_rows(self, rows: list[dict[str, str]]) -> None:
-        for row in rows:
-            self.write_row(row)
+        self._raw_file = None
+
+    def sync(self) -> None:
+        # Все переданные строки — на диск: state-файл, записанный после sync,
+        # не ссылается на строки, которые еще лежат в буферах.
+        with self._lock:
+            if self._file is None:
+                return
+            self._flush_pending()
+            # GzipFile.flush дописывает сжатый блок и сбрасывает файл под ним.
+            self._file.flush()
+            os.fsync(self._raw_file.fileno())
+
+    def write_row(self, row: list[str]) -> None:
+        line = self._encode_row(row)
+        with self._lock:
+            if self._file is None:
+                self._open_next_file()
+
+            if self._rows_in_part >= self.max_rows_per_file:
+                self._open_next_file()
+
+            self._pending.append(line)
+            self._rows_in_part += 1
+            self.total_rows += 1
+            if self.flush_each_row:
+                self._flush_pending()
+                self._file.flush()
+            elif len(self._pending) >= CSV_PENDING_ROWS:
+                self._flush_pending()
+
+    def write_rows(self, rows: list[list[str]]) -> None:
+        # Кодируем до захвата блокировки: под ней остается только запись.
+        lines = list(map(self._encode_row, rows))
+        with self._lock:
+            offset = 0
+            while offset < len(lines):
+                if self._file is None or self._rows_in_part >= self.max_rows_per_file:
+                    self._open_next_file()
+
+                # Кусок до границы текущего файла копим до CSV_PENDING_ROWS строк.
+                chunk = lines[offset : offset + self.max_rows_per_file - self._rows_in_part]
+                self._pending.extend(chunk)
+                self._rows_in_part += len(chunk)
+                self.total_rows += len(chunk)
+                offset += len(chunk)
+                if len(self._pending) >= CSV_PENDING_ROWS:
+                    self._flush_pending()
+
+            if self.flush_each_row and self._file is not None:
+                self._flush_pending()
+                self._file.flush()
 
     def close(self) -> None:
-        self.close_current()
+        with self._lock:
+            self.close_current()
 
 
 def parse_args() -> argparse.Namespace:
@@ -129,8 +261,11 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--limit",
         type=int,
-        default=30,
-        help="Размер пачки одного запроса (по умолчанию 30, максимум 10000).",
+        default=DEFAULT_LIMIT,
+        help=(
+            f"Максимальный размер пачки одного запроса (по умолчанию {DEFAULT_LIMIT}, максимум 10000). "
+            "После 504 или таймаута пачка временно уменьшается."
+        ),
     )
     parser.add_argument(
         "--sleep",
@@ -150,6 +285,34 @@ def parse_args() -> argparse.Namespace:
         default=3.0,
         help="Максимальная случайная пауза между запросами (по умолчанию 3.0).",
     )
+    parser.add_argument(
+        "--inflight",
+        type=int,
+        default=DEFAULT_INFLIGHT,
+        help=(
+            "Сколько страниц одного интервала запрашивать одновременно "
+            f"(по умолчанию {DEFAULT_INFLIGHT} — последовательно)."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=(
+            "Сколько интервалов (страна × период) выгружать параллельно "
+            f"(по умолчанию {DEFAULT_WORKERS}). При значении больше 1 строки разных "
+            "интервалов в CSV перемежаются."
+        ),
+    )
+    parser.add_argument(
+        "--max-rps",
+        type=float,
+        default=0.0,
+        help=(
+            "Общий предел HTTP-запросов в секунду на все потоки "
+            "(--workers × --inflight), по умолчанию 0 — без предела."
+        ),
+    )
     parser.add_argument(
         "--output",
         type=str,
@@ -162,6 +325,13 @@ def parse_args() -> argparse.Namespace:
         default=10000,
         help="Максимум строк в одном CSV файле (по умолчанию 10000).",
     )
+    parser.add_argument(
+        "--compress",
+        type=str,
+        choices=COMPRESS_MODES,
+        default="none",
+        help="Сжатие частей CSV: none или gzip (файлы .csv.gz, по умолчанию none).",
+    )
     parser.add_argument(
         "--request-timeout",
         type=float,
@@ -224,7 +394,19 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--resume",
         action="store_true",
-        help="Продолжить выгрузку с последнего сохраненного skip из state-файла.",
+        help="Продолжить выгрузку с последнего сохраненного skip или курсора из state-файла.",
+    )
+    parser.add_argument(
+        "--pagination",
+        type=str,
+        choices=PAGINATION_MODES,
+        default="skip",
+        help=(
+            "Способ листания: skip — через $skip (по умолчанию), "
+            "keyset — курсором по (docCreationDate, docId) последней записи пачки. "
+            "В keyset сервер не пропускает N строк на каждый запрос, но страницы "
+            "запрашиваются только последовательно (--inflight не действует)."
+        ),
     )
     parser.add_argument(
         "--state-file",
@@ -232,6 +414,16 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULT_STATE_FILE,
         help=f"Файл состояния для resume (по умолчанию {DEFAULT_STATE_FILE}).",
     )
+    parser.add_argument(
+        "--state-flush-every",
+        type=int,
+        default=STATE_FLUSH_EVERY_BATCHES,
+        help=(
+            "Сохранять state на диск раз в N пачек "
+            f"(по умолчанию {STATE_FLUSH_EVERY_BATCHES}; и не реже чем раз в "
+            f"{STATE_FLUSH_SECONDS:g} с, последнее состояние — всегда при завершении)."
+        ),
+    )
     parser.add_argument(
         "--reset-state",
         action="store_true",
@@ -268,8 +460,8 @@ def configure_logging(log_level: str, log_file: str) -> None:
 def load_state(path: str) -> dict:
     if not os.path.exists(path):
         return {"countries": {}}
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    with open(path, "rb") as f:
+        data = orjson.loads(f.read())
     if not isinstance(data, dict):
         return {"countries": {}}
     if "countries" not in data or not isinstance(data["countries"], dict):
@@ -277,13 +469,142 @@ def load_state(path: str) -> dict:
     return data
 
 
-def save_state(path: str, state: dict) -> None:
+def encode_state(state: dict) -> bytes:
+    return orjson.dumps(state, option=orjson.OPT_INDENT_2)
+
+
+def write_state_bytes(path: str, data: bytes) -> None:
+    # Готовые байты пишутся одним write во временный файл и атомарно подменяют state.
+    # fsync до os.replace: после сбоя на диске либо прежний, либо новый state целиком.
     tmp_path = f"{path}.tmp"
-    with open(tmp_path, "w", encoding="utf-8") as f:
-        json.dump(state, f, ensure_ascii=False, indent=2)
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
     os.replace(tmp_path, path)
 
 
+class StateWriter:
+    # State пишет отдельный поток: основной цикл только кладет снимок в очередь
+    # из одного элемента, непрочитанный снимок заменяется свежим. На диск снимок
+    # попадает не чаще раза в STATE_FLUSH_SECONDS секунд или раз в
+    # STATE_FLUSH_EVERY_BATCHES пачек, последний — всегда при flush_and_join.
+    # sync_data вызывается перед каждой записью: позиции в state не опережают
+    # строки, уже лежащие на диске.
+    _STOP = object()
+
+    def __init__(
+        self,
+        path: str,
+        flush_seconds: float = STATE_FLUSH_SECONDS,
+        flush_every: int = STATE_FLUSH_EVERY_BATCHES,
+        sync_data=None,
+    ):
+        self.path = path
+        self.sync_data = sync_data
+        self.flush_seconds = flush_seconds
+        self.flush_every = flush_every
+        self._queue: queue.Queue = queue.Queue(maxsize=1)
+        self._error: BaseException | None = None
+        self._last_written: bytes | None = None
+        self._thread = threading.Thread(target=self._run, name="state-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, state: dict) -> None:
+        # Записи стран заменяются целиком, поэтому хватает копии верхних уровней.
+        snapshot = {**state, "countries": dict(state.get("countries", {}))}
+        while True:
+            try:
+                self._queue.put_nowait(snapshot)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _save(self, snapshot: dict) -> None:
+        data = encode_state(snapshot)
+        # Снимок, совпадающий с уже записанным, на диск не повторяем.
+        if data == self._last_written:
+            return
+        try:
+            if self.sync_data is not None:
+                self.sync_data()
+            write_state_bytes(self.path, data)
+            self._last_written = data
+        except OSError as exc:
+            LOGGER.error("Не удалось сохранить state-файл %s: %s", self.path, exc)
+            self._error = exc
+
+    def _run(self) -> None:
+        # Любая ошибка потока запоминается и поднимается в flush_and_join, иначе
+        # после падения потока основной цикл этого бы не заметил.
+        try:
+            self._loop()
+        except BaseException as exc:
+            LOGGER.error("Поток записи state-файла %s остановлен: %s", self.path, exc)
+            self._error = exc
+
+    def _loop(self) -> None:
+        snapshot = None
+        received = 0
+        last_write = time.monotonic()
+        while True:
+            timeout = None
+            if snapshot is not None:
+                timeout = max(0.0, self.flush_seconds - (time.monotonic() - last_write))
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is self._STOP:
+                if snapshot is not None:
+                    self._save(snapshot)
+                return
+            if item is not None:
+                snapshot = item
+                received += 1
+
+            if snapshot is not None and (
+                received >= self.flush_every
+                or time.monotonic() - last_write >= self.flush_seconds
+            ):
+                self._save(snapshot)
+                snapshot = None
+                received = 0
+                last_write = time.monotonic()
+
+    def flush_and_join(self) -> None:
+        # Если поток уже упал, очередь никто не разберет: ждем места, только
+        # пока поток жив, иначе put заблокировал бы завершение навсегда.
+        while self._thread.is_alive():
+            try:
+                self._queue.put(self._STOP, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self._thread.join()
+        if self._error is not None:
+            raise RuntimeError(f"Не удалось сохранить state-файл {self.path}.") from self._error
+
+
+def sum_until_first_error(futures: list[Future], stop_event: threading.Event) -> int:
+    # Ждем не в порядке отправки: ошибка любой задачи сразу останавливает
+    # остальные на границе пачки, а еще не начатые задачи отменяются.
+    try:
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in done:
+            future.result()
+    except BaseException:
+        stop_event.set()
+        for future in futures:
+            future.cancel()
+        raise
+    return sum(future.result() for future in futures)
+
+
 def ask_countries_interactive() -> list[str]:
     print("Выберите страну для выгрузки:")
     print("1. ALL (все страны ЕАЭС)")
@@ -443,15 +764,62 @@ def iter_time_slices(slice_by: str, start_utc: datetime, end_utc: datetime) -> l
     return slices
 
 
-def maybe_sleep(base_sleep: float, jitter_min: float, jitter_max: float) -> None:
-    pause = max(0.0, base_sleep)
-    if jitter_max > 0:
-        pause += random.uniform(jitter_min, jitter_max)
-    if pause > 0:
-        time.sleep(pause)
-
-
-def create_http_session(max_request_retries: int, user_agent: str) -> requests.Session:
+class TokenBucket:
+    # Общий на все потоки предел частоты запросов: потоки берут по жетону,
+    # жетоны копятся равномерно, поэтому запросы не приходят пачками.
+    def __init__(self, rate_per_second: float, burst: float = 1.0):
+        self.rate_per_second = rate_per_second
+        self.capacity = max(1.0, burst)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate_per_second,
+                )
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                delay = (1.0 - self._tokens) / self.rate_per_second
+            time.sleep(delay)
+
+
+class Sleeper:
+    # Параметры пауз интервала и собственный генератор случайных чисел
+    # собираются один раз, а не передаются в каждый вызов.
+    def __init__(self, base_sleep: float, jitter_min: float, jitter_max: float):
+        self.base_sleep = max(0.0, base_sleep)
+        self.jitter_min = jitter_min
+        self.jitter_max = jitter_max
+        self._uniform = random.Random().uniform
+
+    def pause(self) -> None:
+        pause = self.base_sleep
+        if self.jitter_max > 0:
+            pause += self._uniform(self.jitter_min, self.jitter_max)
+        if pause > 0:
+            time.sleep(pause)
+
+    def backoff(self, attempt: int) -> None:
+        # Экспоненциальная пауза с полным джиттером: повторы после сбоя не
+        # приходят на сервер одновременно, а пауза растет с числом ошибок подряд.
+        ceiling = min(BATCH_BACKOFF_BASE_SECONDS * (2 ** attempt), BATCH_BACKOFF_CAP_SECONDS)
+        pause = max(self.base_sleep, self._uniform(0.0, ceiling))
+        if pause > 0:
+            time.sleep(pause)
+
+
+def create_http_session(
+    max_request_retries: int,
+    user_agent: str,
+    pool_size: int = 1,
+) -> requests.Session:
     retry = Retry(
         total=max_request_retries,
         connect=max_request_retries,
@@ -462,9 +830,18 @@ def create_http_session(max_request_retries: int, user_agent: str) -> requests.S
         allowed_methods=frozenset({"GET"}),
         raise_on_status=False,
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    # Пул не меньше числа одновременных запросов через сессию, чтобы соединения
+    # не закрывались и TLS не повторялся.
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=pool_size)
     session = requests.Session()
-    session.headers.update({"User-Agent": user_agent})
+    session.headers.update(
+        {
+            "User-Agent": user_agent,
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        }
+    )
     session.mount("https://", adapter)
     session.mount("http://", adapter)
     return session
@@ -506,16 +883,20 @@ def parse_structured_value(value):
         return value
 
     text = value.strip()
-    if not text or text in {"[]", "{}", "None", "nan", "NaN", "null"}:
+    if not text or text in EMPTY_TEXTS:
         return ""
 
     if (text.startswith("[") and text.endswith("]")) or (
         text.startswith("{") and text.endswith("}")
     ):
         try:
-            return json.loads(text)
-        except json.JSONDecodeError:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
             pass
+        # ast нужен только для repr Python-объектов со строками в одинарных
+        # кавычках; остальной невалидный JSON сразу возвращаем как есть.
+        if "'" not in text:
+            return value
         try:
             return ast.literal_eval(text)
         except (ValueError, SyntaxError):
@@ -525,6 +906,11 @@ def parse_structured_value(value):
 
 
 def flatten_for_humans(value) -> str:
+    # Большинство значений — обычные строки: проверяем их первыми, без рекурсии.
+    if type(value) is str:
+        text = value.strip()
+        return "" if text in EMPTY_TEXTS else text
+
     if isinstance(value, list):
         if not value:
             return ""
@@ -541,9 +927,7 @@ def flatten_for_humans(value) -> str:
         return "; ".join(parts)
 
     text = str(value).strip() if value is not None else ""
-    if text in {"None", "nan", "NaN", "null", "[]", "{}"}:
-        return ""
-    return text
+    return "" if text in EMPTY_TEXTS else text
 
 
 def get_nested(obj: dict, path: str, default=""):
@@ -594,10 +978,23 @@ def get_update_datetime_value(record: dict) -> str:
     return ""
 
 
+@functools.lru_cache(maxsize=None)
+def utc_seconds_prefix(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
 def record_matches_updated_from(record: dict, updated_from_dt: datetime | None) -> bool:
     if updated_from_dt is None:
         return True
     update_text = get_update_datetime_value(record)
+    # Время в UTC вида YYYY-MM-DDTHH:MM:SS[.fff]Z сравниваем как строку до секунд:
+    # для ISO-8601 порядок строк совпадает с порядком времени. Разбор нужен,
+    # только если секунды совпали или формат другой.
+    if UTC_TIMESTAMP_RE.match(update_text):
+        update_prefix = update_text[:19]
+        updated_from_prefix = utc_seconds_prefix(updated_from_dt)
+        if update_prefix != updated_from_prefix:
+            return update_prefix > updated_from_prefix
     update_dt = parse_iso_datetime_utc(update_text)
     if update_dt is None:
         return False
@@ -615,15 +1012,18 @@ def build_slice_clauses(date_field: str, start_date: str, end_date: str) -> list
 
 def normalize_record(item: object, country_code: str) -> dict:
     if isinstance(item, dict):
-        row = item.copy()
+        # Запись дальше только читается, поэтому копия нужна, лишь когда
+        # приходится дописать страну. ODATA отдает страну вложенной:
+        # {"unifiedCountryCode": {"value": ...}}.
+        if item.get(COUNTRY_FIELD) or GET_COUNTRY(item):
+            return item
+        row = dict(item)
     elif isinstance(item, str):
-        stripped = item.strip()
-        parsed = None
-        if stripped:
-            try:
-                parsed = json.loads(stripped)
-            except json.JSONDecodeError:
-                parsed = None
+        # orjson.loads сам пропускает пробелы по краям, а пустую строку отвергает.
+        try:
+            parsed = orjson.loads(item)
+        except orjson.JSONDecodeError:
+            parsed = None
         if isinstance(parsed, dict):
             row = parsed
         else:
@@ -638,10 +1038,10 @@ def normalize_record(item: object, country_code: str) -> dict:
     return row
 
 
-def to_ddmmyyyy(value) -> str:
-    text = flatten_for_humans(value).strip()
-    if not text:
-        return ""
+# Даты начала и окончания у документов пачки сильно повторяются: строку даты
+# разбираем и форматируем один раз, дальше берем готовый дд.мм.гггг из кэша.
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def format_ddmmyyyy(text: str) -> str:
     try:
         dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
         return dt.strftime("%d.%m.%Y")
@@ -649,6 +1049,13 @@ def to_ddmmyyyy(value) -> str:
         return ""
 
 
+def to_ddmmyyyy(value) -> str:
+    text = flatten_for_humans(value).strip()
+    if not text:
+        return ""
+    return format_ddmmyyyy(text)
+
+
 def extract_from_structured(value, key: str) -> str:
     parsed = parse_structured_value(value)
     if isinstance(parsed, dict):
@@ -665,59 +1072,110 @@ def extract_from_structured(value, key: str) -> str:
     return ""
 
 
-def status_from_record(record: dict) -> str:
+# Сроки действия у многих документов совпадают: каждую строку даты разбираем один раз.
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_validity_datetime(text: str) -> datetime | None:
+    try:
+        end_dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if end_dt.tzinfo is None:
+        end_dt = end_dt.replace(tzinfo=timezone.utc)
+    return end_dt
+
+
+def status_from_record(record: dict, now_utc: datetime) -> str:
     end_date_raw = get_date_value(record, "docValidityDate")
-    status_code = flatten_for_humans(get_nested(record, "docStatusDetails.docStatusCode", "")).strip()
-    note_text = flatten_for_humans(get_nested(record, "docStatusDetails.noteText", "")).strip().lower()
+    status_code = flatten_for_humans(GET_STATUS_CODE(record)).strip()
+    note_text = flatten_for_humans(GET_NOTE_TEXT(record)).strip().lower()
 
     end_text = flatten_for_humans(end_date_raw).strip()
     if end_text:
-        try:
-            end_dt = datetime.fromisoformat(end_text.replace("Z", "+00:00"))
-            now = datetime.now(timezone.utc)
-            if end_dt.tzinfo is None:
-                end_dt = end_dt.replace(tzinfo=timezone.utc)
-            return "действует" if end_dt >= now else "прекращен"
-        except ValueError:
-            pass
+        end_dt = parse_validity_datetime(end_text)
+        if end_dt is not None:
+            return "действует" if end_dt >= now_utc else "прекращен"
 
     if "прекращ" in note_text:
         return "прекращен"
-    if status_code in {"09", "10"}:
+    if status_code in CLOSED_STATUS_CODES:
         return "прекращен"
     if status_code:
         return "действует"
     return ""
 
 
-def record_to_selected_row(record: dict) -> dict[str, str]:
-    country_code = flatten_for_humans(record.get(COUNTRY_FIELD, "")).strip()
+def compile_nested_path(path: str):
+    # Путь разбирается один раз; семантика как у get_nested(record, path, "").
+    keys = tuple(path.split("."))
+
+    def getter(record: dict):
+        current = record
+        for key in keys:
+            if isinstance(current, dict) and key in current:
+                current = current[key]
+            else:
+                return ""
+        return current
+
+    return getter
+
+
+GET_COUNTRY = compile_nested_path(COUNTRY_FIELD)
+GET_APPLICANT = compile_nested_path("applicantDetails.businessEntityName")
+GET_MANUFACTURERS = compile_nested_path("technicalRegulationObjectDetails.manufacturerDetails")
+GET_AUTHORITY = compile_nested_path("conformityAuthorityV2Details.businessEntityName")
+GET_STATUS_CODE = compile_nested_path("docStatusDetails.docStatusCode")
+GET_NOTE_TEXT = compile_nested_path("docStatusDetails.noteText")
 
-    applicant = flatten_for_humans(get_nested(record, "applicantDetails.businessEntityName", ""))
-    manufacturer = extract_from_structured(
-        get_nested(record, "technicalRegulationObjectDetails.manufacturerDetails", ""),
-        "businessEntityName",
-    )
-    if not manufacturer:
-        manufacturer = applicant
 
+def extract_country_name(record: dict) -> str:
+    country_code = flatten_for_humans(record.get(COUNTRY_FIELD) or GET_COUNTRY(record)).strip()
+    return COUNTRY_NAMES_RU.get(country_code, country_code)
+
+
+def extract_term(record: dict) -> str:
     start = to_ddmmyyyy(get_date_value(record, "docStartDate"))
     end = to_ddmmyyyy(get_date_value(record, "docValidityDate"))
-    term = f"{start} - {end}" if start and end else (start or end)
-
-    return {
-        "Регистрационный номер документа": flatten_for_humans(record.get("docId", "")),
-        "Страна": COUNTRY_NAMES_RU.get(country_code, country_code),
-        "Вид документа": flatten_for_humans(record.get("conformityDocKindName", "")),
-        "Срок действия": term,
-        "Заявитель": applicant,
-        "Изготовитель": manufacturer,
-        "Технический регламент": flatten_for_humans(parse_structured_value(record.get("technicalRegulationId", ""))),
-        "Наименование органа по оценке соответствия": flatten_for_humans(
-            get_nested(record, "conformityAuthorityV2Details.businessEntityName", "")
-        ),
-        "Статус действия": status_from_record(record),
-    }
+    return f"{start} - {end}" if start and end else (start or end)
+
+
+def extract_applicant(record: dict) -> str:
+    return flatten_for_humans(GET_APPLICANT(record))
+
+
+def extract_manufacturer(record: dict) -> str:
+    manufacturer = extract_from_structured(GET_MANUFACTURERS(record), "businessEntityName")
+    return manufacturer or extract_applicant(record)
+
+
+# Колонка -> функция извлечения значения; порядок совпадает с OUTPUT_COLUMNS,
+# строка CSV собирается позиционно. Статус зависит еще и от текущего времени
+# и добавляется в record_to_selected_row.
+ROW_EXTRACTORS = (
+    ("Регистрационный номер документа", lambda record: flatten_for_humans(record.get("docId", ""))),
+    ("Страна", extract_country_name),
+    ("Вид документа", lambda record: flatten_for_humans(record.get("conformityDocKindName", ""))),
+    ("Срок действия", extract_term),
+    ("Заявитель", extract_applicant),
+    ("Изготовитель", extract_manufacturer),
+    (
+        "Технический регламент",
+        lambda record: flatten_for_humans(parse_structured_value(record.get("technicalRegulationId", ""))),
+    ),
+    (
+        "Наименование органа по оценке соответствия",
+        lambda record: flatten_for_humans(GET_AUTHORITY(record)),
+    ),
+)
+
+
+ROW_VALUE_EXTRACTORS = tuple(extract for _, extract in ROW_EXTRACTORS)
+
+
+def record_to_selected_row(record: dict, now_utc: datetime) -> list[str]:
+    row = [extract(record) for extract in ROW_VALUE_EXTRACTORS]
+    row.append(status_from_record(record, now_utc))
+    return row
 
 
 def build_odata_filter(
@@ -734,47 +1192,80 @@ def build_odata_filter(
     return " and ".join(clauses)
 
 
+def build_keyset_clause(cursor: tuple[str, str]) -> str:
+    # Порядок docCreationDate desc, docId desc: следующая страница — записи строго
+    # после последней выданной, docId разводит записи с одинаковой датой.
+    created, doc_id = cursor
+    doc_id_literal = doc_id.replace("'", "''")
+    return (
+        f"(docCreationDate lt {created} or "
+        f"(docCreationDate eq {created} and docId lt '{doc_id_literal}'))"
+    )
+
+
+def keyset_cursor_from_record(item: object, country_code: str) -> tuple[str, str] | None:
+    record = normalize_record(item, country_code)
+    created = get_date_value(record, "docCreationDate")
+    doc_id = record.get("docId")
+    if not isinstance(created, str) or not UTC_TIMESTAMP_RE.match(created) or not doc_id:
+        return None
+    return created, str(doc_id)
+
+
+# $filter и $orderby одинаковы для всех страниц интервала: кодируем их один раз.
+@functools.lru_cache(maxsize=256)
+def encoded_filter_query(odata_filter: str, order_by: str) -> str:
+    return urlencode({"$filter": odata_filter, "$orderby": order_by})
+
+
 def fetch_batch(
     session: requests.Session,
     country_code: str,
     skip: int,
     top: int,
-    updated_from: str | None,
-    apply_server_updated_filter: bool,
-    extra_clauses: list[str] | None,
+    odata_filter: str,
     request_timeout: float,
+    keyset_cursor: tuple[str, str] | None = None,
+    keyset: bool = False,
 ) -> list[object]:
-    params = {
-        "$top": top,
-        "$skip": skip,
-        "$filter": build_odata_filter(
-            country_code,
-            updated_from,
-            apply_server_updated_filter,
-            extra_clauses,
-        ),
-        "$orderby": "docCreationDate desc",
-    }
+    order_by = KEYSET_ORDER_BY if keyset else SKIP_ORDER_BY
+    if keyset_cursor is not None:
+        odata_filter = f"{odata_filter} and {build_keyset_clause(keyset_cursor)}"
+        filter_query = urlencode({"$filter": odata_filter, "$orderby": order_by})
+    else:
+        filter_query = encoded_filter_query(odata_filter, order_by)
+    # Меняющиеся $top и $skip дописываем к уже закодированной части готовой строкой.
+    url = f"{BASE_URL}?{filter_query}&%24top={top}"
+    if not keyset:
+        url += f"&%24skip={skip}"
 
     started = time.monotonic()
     LOGGER.debug(
-        "HTTP request start: country=%s skip=%s top=%s updated_from=%s server_filter=%s",
+        "HTTP request start: country=%s skip=%s cursor=%s top=%s filter=%s",
         country_code,
         skip,
+        keyset_cursor,
         top,
-        updated_from,
-        apply_server_updated_filter,
+        odata_filter,
     )
-    response = session.get(BASE_URL, params=params, timeout=request_timeout)
+    response = session.get(url, timeout=request_timeout)
     elapsed = time.monotonic() - started
     LOGGER.debug(
-        "HTTP response: status=%s elapsed=%.2fs url=%s",
+        "HTTP response: status=%s elapsed=%.2fs encoding=%s url=%s",
         response.status_code,
         elapsed,
+        response.headers.get("Content-Encoding", "identity"),
         response.url,
     )
     response.raise_for_status()
-    return odata_extract_records(response.json())
+    try:
+        payload = orjson.loads(response.content)
+    except orjson.JSONDecodeError as exc:
+        # Как и response.json(): битый ответ обрабатывается как сетевая ошибка с повтором.
+        raise requests.exceptions.InvalidJSONError(
+            f"Некорректный JSON в ответе: {exc}", response=response
+        ) from exc
+    return odata_extract_records(payload)
 
 
 def stream_country(
@@ -793,134 +1284,231 @@ def stream_country(
     jitter_max: float,
     writer: CsvPartWriter,
     progress_callback,
+    inflight: int = DEFAULT_INFLIGHT,
+    pagination: str = "skip",
+    start_cursor: tuple[str, str] | None = None,
+    stop_event: threading.Event | None = None,
+    rate_limiter: TokenBucket | None = None,
+    client_filter_fallback: bool = False,
 ) -> int:
     total_written = 0
     skip = start_skip
+    keyset = pagination == "keyset"
+    cursor = start_cursor
+    sleeper = Sleeper(sleep_seconds, jitter_min, jitter_max)
     batch_count = (start_skip // limit) + 1
     consecutive_errors = 0
     use_server_updated_filter = bool(updated_from) and date_filter_mode in {"server", "auto"}
     use_client_updated_filter = bool(updated_from) and date_filter_mode == "client"
+    if use_server_updated_filter and date_filter_mode == "auto" and client_filter_fallback:
+        # Сервер уже отвечал 504 на этот фильтр для страны: сразу локальный фильтр,
+        # без повторной пробы с таймаутом.
+        use_server_updated_filter = False
+        use_client_updated_filter = True
+        LOGGER.info(
+            "%s: интервал %s начинаю с client-filter по updateDateTime (server-filter ранее не прошел).",
+            country_code,
+            slice_label,
+        )
 
     print(
         f"\nСтарт выгрузки страны {country_code} "
         f"(limit={limit}, обновлено с: {updated_from if updated_from else 'без фильтра'}, "
-        f"skip={start_skip}, режим={date_filter_mode}, интервал={slice_label})"
+        f"skip={start_skip}, режим={date_filter_mode}, интервал={slice_label}, inflight={inflight}, "
+        f"листание={pagination})"
     )
+    # Курсор следующей страницы известен только после разбора текущей,
+    # поэтому в keyset заранее запрашивать нечего.
+    window = 1 if keyset else inflight
+
+    # Размер страницы подстраивается под сервер: после 504 или таймаута $top
+    # уменьшается вдвое, после быстрых ответов снова растет до limit.
+    current_top = limit
+    min_top = min(ADAPTIVE_MIN_TOP, limit)
+
+    # Окно запросов: следующие страницы запрашиваются заранее (skip + top, ...),
+    # а обрабатываются и сохраняются в state строго по порядку. После любой ошибки
+    # заранее сделанные запросы отбрасываются: фильтр или skip могли измениться.
+    pending: deque[tuple[int, int, Future]] = deque()
+    # $filter меняется только при переключении server -> client, а не от страницы
+    # к странице: оба варианта собираем один раз на интервал.
+    odata_filters = {
+        server_filter: build_odata_filter(country_code, updated_from, server_filter, extra_clauses)
+        for server_filter in (False, True)
+    }
 
-    while True:
-        try:
-            data = fetch_batch(
-                session=session,
-                country_code=country_code,
-                skip=skip,
-                top=limit,
-                updated_from=updated_from,
-                apply_server_updated_filter=use_server_updated_filter,
-                extra_clauses=extra_clauses,
-                request_timeout=request_timeout,
-            )
-            consecutive_errors = 0
-        except requests.HTTPError as exc:
-            status = exc.response.status_code if exc.response is not None else None
-            if (
-                status == 504
-                and updated_from
-                and date_filter_mode == "auto"
-                and use_server_updated_filter
-            ):
-                use_server_updated_filter = False
-                use_client_updated_filter = True
+    def timed_fetch(
+        page_skip: int,
+        top: int,
+        server_filter: bool,
+        page_cursor: tuple[str, str] | None,
+    ) -> tuple[list[object], float]:
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        started = time.monotonic()
+        data = fetch_batch(
+            session=session,
+            country_code=country_code,
+            skip=page_skip,
+            top=top,
+            odata_filter=odata_filters[server_filter],
+            request_timeout=request_timeout,
+            keyset_cursor=page_cursor,
+            keyset=keyset,
+        )
+        return data, time.monotonic() - started
+
+    def submit(page_skip: int) -> None:
+        future = pool.submit(timed_fetch, page_skip, current_top, use_server_updated_filter, cursor)
+        pending.append((page_skip, current_top, future))
+
+    def shrink_top() -> None:
+        nonlocal current_top
+        if current_top > min_top:
+            current_top = max(min_top, current_top // 2)
+            print(f"{country_code}: уменьшаю размер страницы до top={current_top}.")
+
+    def discard_pending() -> None:
+        while pending:
+            pending.popleft()[2].cancel()
+
+    pool = ThreadPoolExecutor(max_workers=window)
+    try:
+        while stop_event is None or not stop_event.is_set():
+            request_skip = pending[-1][0] + pending[-1][1] if pending else skip
+            while len(pending) < window:
+                submit(request_skip)
+                request_skip += current_top
+
+            _, page_top, future = pending.popleft()
+            try:
+                data, elapsed = future.result()
+                consecutive_errors = 0
+            except requests.HTTPError as exc:
+                discard_pending()
+                status = exc.response.status_code if exc.response is not None else None
+                if (
+                    status == 504
+                    and updated_from
+                    and date_filter_mode == "auto"
+                    and use_server_updated_filter
+                ):
+                    use_server_updated_filter = False
+                    use_client_updated_filter = True
+                    LOGGER.warning(
+                        "%s: API возвращает 504 на server updated-filter, переключаюсь на client-filter.",
+                        country_code,
+                    )
+                    print(
+                        f"{country_code}: API вернул 504 на серверный фильтр по дате. "
+                        "Переключаюсь на локальный фильтр по updateDateTime."
+                    )
+                    sleeper.backoff(1)
+                    continue
+                if status is not None and 400 <= status < 500 and status != 429:
+                    body = (exc.response.text or "").strip()[:500] if exc.response is not None else ""
+                    details = f" HTTP {status}."
+                    if body:
+                        details += f" Ответ API: {body}"
+                    raise RuntimeError(
+                        f"{country_code}: остановка на skip={skip}.{details}"
+                    ) from exc
+                if status == 504:
+                    shrink_top()
+                consecutive_errors += 1
                 LOGGER.warning(
-                    "%s: API возвращает 504 на server updated-filter, переключаюсь на client-filter.",
+                    "%s: HTTP ошибка на skip=%s (status=%s), попытка %s/%s",
                     country_code,
+                    skip,
+                    status,
+                    consecutive_errors,
+                    MAX_CONSECUTIVE_BATCH_ERRORS,
                 )
+                if consecutive_errors >= MAX_CONSECUTIVE_BATCH_ERRORS:
+                    raise RuntimeError(
+                        f"{country_code}: слишком много HTTP-ошибок подряд "
+                        f"({consecutive_errors}) на skip={skip}."
+                    ) from exc
                 print(
-                    f"{country_code}: API вернул 504 на серверный фильтр по дате. "
-                    "Переключаюсь на локальный фильтр по updateDateTime."
+                    f"{country_code}: HTTP ошибка на skip={skip} (status={status}). "
+                    "Повторю через паузу."
                 )
-                maybe_sleep(max(2.0, sleep_seconds), jitter_min, jitter_max)
+                sleeper.backoff(consecutive_errors)
                 continue
-            if status is not None and 400 <= status < 500 and status != 429:
-                body = (exc.response.text or "").strip()[:500] if exc.response is not None else ""
-                details = f" HTTP {status}."
-                if body:
-                    details += f" Ответ API: {body}"
-                raise RuntimeError(
-                    f"{country_code}: остановка на skip={skip}.{details}"
-                ) from exc
-            consecutive_errors += 1
-            LOGGER.warning(
-                "%s: HTTP ошибка на skip=%s (status=%s), попытка %s/%s",
-                country_code,
-                skip,
-                status,
-                consecutive_errors,
-                MAX_CONSECUTIVE_BATCH_ERRORS,
-            )
-            if consecutive_errors >= MAX_CONSECUTIVE_BATCH_ERRORS:
-                raise RuntimeError(
-                    f"{country_code}: слишком много HTTP-ошибок подряд "
-                    f"({consecutive_errors}) на skip={skip}."
-                ) from exc
-            print(
-                f"{country_code}: HTTP ошибка на skip={skip} (status={status}). "
-                "Повторю через паузу."
-            )
-            maybe_sleep(max(2.0, sleep_seconds), jitter_min, jitter_max)
-            continue
-        except requests.RequestException as exc:
-            consecutive_errors += 1
-            if consecutive_errors >= MAX_CONSECUTIVE_BATCH_ERRORS:
-                raise RuntimeError(
-                    f"{country_code}: слишком много сетевых ошибок подряд "
-                    f"({consecutive_errors}) на skip={skip}."
-                ) from exc
-            LOGGER.warning(
-                "%s: сетевая ошибка на skip=%s, попытка %s/%s: %s",
-                country_code,
-                skip,
-                consecutive_errors,
-                MAX_CONSECUTIVE_BATCH_ERRORS,
-                exc,
-            )
-            print(
-                f"{country_code}: ошибка сети на skip={skip}: {exc}. "
-                "Повторю через паузу."
-            )
-            maybe_sleep(max(2.0, sleep_seconds), jitter_min, jitter_max)
-            continue
-
-        if not data:
-            print(f"{country_code}: данные закончились на skip={skip}.")
-            progress_callback(country_code, skip, total_written, True, use_client_updated_filter)
-            break
-
-        rows = []
-        for item in data:
-            record = normalize_record(item, country_code)
-            if use_client_updated_filter and not record_matches_updated_from(record, updated_from_dt):
+            except requests.RequestException as exc:
+                discard_pending()
+                if isinstance(exc, requests.Timeout):
+                    shrink_top()
+                consecutive_errors += 1
+                if consecutive_errors >= MAX_CONSECUTIVE_BATCH_ERRORS:
+                    raise RuntimeError(
+                        f"{country_code}: слишком много сетевых ошибок подряд "
+                        f"({consecutive_errors}) на skip={skip}."
+                    ) from exc
+                LOGGER.warning(
+                    "%s: сетевая ошибка на skip=%s, попытка %s/%s: %s",
+                    country_code,
+                    skip,
+                    consecutive_errors,
+                    MAX_CONSECUTIVE_BATCH_ERRORS,
+                    exc,
+                )
+                print(
+                    f"{country_code}: ошибка сети на skip={skip}: {exc}. "
+                    "Повторю через паузу."
+                )
+                sleeper.backoff(consecutive_errors)
                 continue
-            rows.append(record_to_selected_row(record))
-
-        if rows:
-            writer.write_rows(rows)
-            total_written += len(rows)
 
-        print(
-            f"{country_code} | пачка #{batch_count}: получено {len(data)} записей, "
-            f"записано {len(rows)} (skip={skip}, top={limit})"
-        )
-        next_skip = skip + len(data)
-        progress_callback(country_code, next_skip, total_written, False, use_client_updated_filter)
+            if not data:
+                print(f"{country_code}: данные закончились на skip={skip}.")
+                progress_callback(country_code, skip, cursor, total_written, True, use_client_updated_filter)
+                break
+
+            rows = []
+            # Статус документов пачки считаем относительно одного момента времени.
+            now_utc = datetime.now(timezone.utc)
+            for item in data:
+                # Словарь проверяем фильтром как есть: копия и поле страны из
+                # normalize_record нужны только записям, которые попадут в CSV.
+                record = item if isinstance(item, dict) else normalize_record(item, country_code)
+                if use_client_updated_filter and not record_matches_updated_from(record, updated_from_dt):
+                    continue
+                if record is item:
+                    record = normalize_record(item, country_code)
+                rows.append(record_to_selected_row(record, now_utc))
 
-        if len(data) < limit:
-            print(f"{country_code}: достигнут конец доступных данных.")
-            progress_callback(country_code, next_skip, total_written, True, use_client_updated_filter)
-            break
+            if rows:
+                writer.write_rows(rows)
+                total_written += len(rows)
 
-        skip = next_skip
-        batch_count += 1
-        maybe_sleep(sleep_seconds, jitter_min, jitter_max)
+            print(
+                f"{country_code} | пачка #{batch_count}: получено {len(data)} записей, "
+                f"записано {len(rows)} (skip={skip}, top={page_top})"
+            )
+            next_skip = skip + len(data)
+            if keyset:
+                cursor = keyset_cursor_from_record(data[-1], country_code)
+                if cursor is None:
+                    raise RuntimeError(
+                        f"{country_code}: у последней записи пачки нет docCreationDate/docId "
+                        "для keyset-листания. Используйте --pagination skip."
+                    )
+            progress_callback(country_code, next_skip, cursor, total_written, False, use_client_updated_filter)
+
+            if len(data) < page_top:
+                print(f"{country_code}: достигнут конец доступных данных.")
+                progress_callback(country_code, next_skip, cursor, total_written, True, use_client_updated_filter)
+                break
+
+            if elapsed < ADAPTIVE_FAST_RESPONSE_SECONDS and current_top < limit:
+                current_top = min(limit, current_top * 2)
+            skip = next_skip
+            batch_count += 1
+            sleeper.pause()
+    finally:
+        discard_pending()
+        pool.shutdown(wait=True)
 
     print(f"{country_code}: записано {total_written} строк.")
     return total_written
@@ -932,18 +1520,22 @@ def main() -> None:
     LOGGER.info("Запуск выгрузки ЕАЭС ODATA")
     LOGGER.info(
         (
-            "Параметры: countries=%s updated_from=%s limit=%s sleep=%s jitter=[%s,%s] "
-            "max_rows_per_file=%s request_timeout=%s request_retries=%s "
+            "Параметры: countries=%s updated_from=%s limit=%s inflight=%s workers=%s max_rps=%s sleep=%s jitter=[%s,%s] "
+            "max_rows_per_file=%s compress=%s request_timeout=%s request_retries=%s "
             "date_filter_mode=%s slice_by=%s slice_field=%s slice_start=%s slice_end=%s "
-            "resume=%s state_file=%s"
+            "pagination=%s resume=%s state_file=%s state_flush_every=%s"
         ),
         args.countries if args.countries else "ASK",
         args.updated_from if args.updated_from is not None else "ASK",
         args.limit,
+        args.inflight,
+        args.workers,
+        args.max_rps,
         args.sleep,
         args.sleep_jitter_min,
         args.sleep_jitter_max,
         args.max_rows_per_file,
+        args.compress,
         args.request_timeout,
         args.request_retries,
         args.date_filter_mode,
@@ -951,14 +1543,24 @@ def main() -> None:
         args.slice_date_field,
         args.slice_start,
         args.slice_end if args.slice_end else "today",
+        args.pagination,
         args.resume,
         args.state_file,
+        args.state_flush_every,
     )
 
     if args.limit <= 0:
         raise ValueError("--limit должен быть больше 0.")
     if args.limit > 10000:
         raise ValueError("--limit не должен быть больше 10000.")
+    if args.inflight <= 0:
+        raise ValueError("--inflight должен быть больше 0.")
+    if args.workers <= 0:
+        raise ValueError("--workers должен быть больше 0.")
+    if args.max_rps < 0:
+        raise ValueError("--max-rps не может быть отрицательным.")
+    if args.state_flush_every <= 0:
+        raise ValueError("--state-flush-every должен быть больше 0.")
     if args.request_timeout <= 0:
         raise ValueError("--request-timeout должен быть больше 0.")
     if args.request_retries < 0:
@@ -1018,6 +1620,10 @@ def main() -> None:
         "slice_start": args.slice_start,
         "slice_end": slice_end_raw,
     }
+    # skip и курсор не взаимозаменяемы при resume. Для skip поле не пишем,
+    # чтобы прежние state-файлы оставались совместимыми.
+    if args.pagination != "skip":
+        signature["pagination"] = args.pagination
     if args.resume and state.get("signature") and state["signature"] != signature:
         raise ValueError(
             "State-файл создан для других параметров выгрузки. "
@@ -1026,76 +1632,156 @@ def main() -> None:
     state["signature"] = signature
 
     def persist_country_state(
+        country: str,
         state_key: str,
         next_skip: int,
+        cursor: tuple[str, str] | None,
         written: int,
         done: bool,
         client_filter_active: bool,
     ) -> None:
-        countries_state = state.setdefault("countries", {})
-        countries_state[state_key] = {
-            "next_skip": next_skip,
-            "written_in_run": written,
-            "done": done,
-            "client_filter_active": client_filter_active,
-            "updated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-        }
-        save_state(args.state_file, state)
+        with state_lock:
+            countries_state = state.setdefault("countries", {})
+            countries_state[state_key] = {
+                "next_skip": next_skip,
+                "cursor": list(cursor) if cursor else None,
+                "written_in_run": written,
+                "done": done,
+                "client_filter_active": client_filter_active,
+                "updated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            }
+            if updated_from and args.date_filter_mode == "auto":
+                # Поддержка серверного фильтра запоминается по стране: отказ
+                # (переход на client) не отменяется успехом другого интервала.
+                server_ok = state.setdefault("server_updated_ok", {})
+                if client_filter_active:
+                    server_ok[country] = False
+                else:
+                    server_ok.setdefault(country, True)
+            state_writer.submit(state)
 
     filename = output_name(countries, updated_from, args.output)
-    if args.resume and args.output and os.path.exists(filename):
+    first_part = f"{filename}.gz" if args.compress == "gzip" else filename
+    if args.resume and args.output and os.path.exists(first_part):
         raise ValueError(
-            f"Файл {filename} уже существует. При --resume укажите другое --output, "
+            f"Файл {first_part} уже существует. При --resume укажите другое --output, "
             "чтобы не перезаписать ранее выгруженные данные."
         )
-    writer = CsvPartWriter(filename, args.max_rows_per_file, OUTPUT_COLUMNS)
-    session = create_http_session(args.request_retries, args.user_agent)
+    writer = CsvPartWriter(filename, args.max_rows_per_file, OUTPUT_COLUMNS, compress=args.compress)
+    state_writer = StateWriter(
+        args.state_file,
+        flush_every=args.state_flush_every,
+        sync_data=writer.sync,
+    )
+    state_lock = threading.Lock()
+    tasks = []
+    for country in countries:
+        for slice_label, slice_start, slice_end in time_slices:
+            state_key = f"{country}|{slice_label}"
+            country_state = state.get("countries", {}).get(state_key, {})
+            if args.resume and country_state.get("done") is True:
+                LOGGER.info("%s: пропуск, интервал %s уже завершен по state-файлу.", country, slice_label)
+                continue
+            tasks.append((country, slice_label, slice_start, slice_end, country_state))
+    workers = max(1, min(args.workers, len(tasks)))
+
+    # У каждого потока-выгрузчика своя сессия со своим пулом соединений размером
+    # --inflight: окно предзагрузки интервала использует соединения только своего
+    # пула и не ждет свободного соединения, занятого другим интервалом. Внутри
+    # интервала сессию делят потоки окна: они только выполняют GET, заголовки и
+    # cookies сессии после создания не меняются.
+    thread_state = threading.local()
+    sessions: list[requests.Session] = []
+    sessions_lock = threading.Lock()
+
+    def thread_session() -> requests.Session:
+        session = getattr(thread_state, "session", None)
+        if session is None:
+            session = create_http_session(args.request_retries, args.user_agent, pool_size=args.inflight)
+            thread_state.session = session
+            with sessions_lock:
+                sessions.append(session)
+        return session
+
+    def export_slice(
+        country: str,
+        slice_label: str,
+        slice_start: str,
+        slice_end: str,
+        country_state: dict,
+    ) -> int:
+        state_key = f"{country}|{slice_label}"
+        slice_clauses = build_slice_clauses(args.slice_date_field, slice_start, slice_end)
+        start_skip = int(country_state.get("next_skip", 0)) if args.resume else 0
+        saved_cursor = country_state.get("cursor") if args.resume else None
+        start_cursor = tuple(saved_cursor) if saved_cursor else None
+        # skip, накопленный с локальным фильтром, относится к выборке без серверного
+        # фильтра, поэтому такой интервал продолжается в том же режиме.
+        with state_lock:
+            client_filter_fallback = state.get("server_updated_ok", {}).get(country) is False
+        if args.resume and country_state.get("client_filter_active") is True:
+            client_filter_fallback = True
+        if start_skip > 0:
+            LOGGER.info(
+                "%s: продолжаю интервал %s с skip=%s cursor=%s по state-файлу.",
+                country,
+                slice_label,
+                start_skip,
+                start_cursor,
+            )
 
-    total = 0
-    try:
-        for country in countries:
-            for slice_label, slice_start, slice_end in time_slices:
-                state_key = f"{country}|{slice_label}"
-                slice_clauses = build_slice_clauses(args.slice_date_field, slice_start, slice_end)
-                country_state = state.get("countries", {}).get(state_key, {})
-                if args.resume and country_state.get("done") is True:
-                    LOGGER.info("%s: пропуск, интервал %s уже завершен по state-файлу.", country, slice_label)
-                    continue
-                start_skip = int(country_state.get("next_skip", 0)) if args.resume else 0
-                if start_skip > 0:
-                    LOGGER.info(
-                        "%s: продолжаю интервал %s с skip=%s по state-файлу.",
-                        country,
-                        slice_label,
-                        start_skip,
-                    )
+        return stream_country(
+            session=thread_session(),
+            country_code=country,
+            limit=args.limit,
+            sleep_seconds=args.sleep,
+            updated_from=updated_from,
+            updated_from_dt=updated_from_dt,
+            date_filter_mode=args.date_filter_mode,
+            start_skip=start_skip,
+            extra_clauses=slice_clauses,
+            slice_label=slice_label,
+            request_timeout=args.request_timeout,
+            jitter_min=args.sleep_jitter_min,
+            jitter_max=args.sleep_jitter_max,
+            writer=writer,
+            inflight=args.inflight,
+            pagination=args.pagination,
+            start_cursor=start_cursor,
+            stop_event=stop_event,
+            rate_limiter=rate_limiter,
+            client_filter_fallback=client_filter_fallback,
+            progress_callback=lambda c, n, cur, w, d, client: persist_country_state(
+                c,
+                state_key,
+                n,
+                cur,
+                w,
+                d,
+                client,
+            ),
+        )
 
-                total += stream_country(
-                    session=session,
-                    country_code=country,
-                    limit=args.limit,
-                    sleep_seconds=args.sleep,
-                    updated_from=updated_from,
-                    updated_from_dt=updated_from_dt,
-                    date_filter_mode=args.date_filter_mode,
-                    start_skip=start_skip,
-                    extra_clauses=slice_clauses,
-                    slice_label=slice_label,
-                    request_timeout=args.request_timeout,
-                    jitter_min=args.sleep_jitter_min,
-                    jitter_max=args.sleep_jitter_max,
-                    writer=writer,
-                    progress_callback=lambda c, n, w, d, client, key=state_key: persist_country_state(
-                        key,
-                        n,
-                        w,
-                        d,
-                        client,
-                    ),
-                )
-    finally:
-        writer.close()
-        session.close()
+    rate_limiter = TokenBucket(args.max_rps) if args.max_rps > 0 else None
+
+    # Интервалы независимы: каждый идет своим потоком со своим skip и state.
+    # После первой ошибки остальные интервалы останавливаются на границе пачки.
+    stop_event = threading.Event()
+    def close_sessions() -> None:
+        for session in sessions:
+            session.close()
+
+    total = 0
+    # Шаги завершения выполняются в обратном порядке регистрации, и ошибка одного
+    # не отменяет остальные: последний снимок state пишется, даже если не
+    # закрылся CSV.
+    with ExitStack() as cleanup:
+        cleanup.callback(state_writer.flush_and_join)
+        cleanup.callback(close_sessions)
+        cleanup.callback(writer.close)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(export_slice, *task) for task in tasks]
+            total = sum_until_first_error(futures, stop_event)
 
     if total == 0:
         print("Данные не получены.")
@@ -1,9 +1,35 @@
 import argparse
 import ast
-import json
+import codecs
+import csv
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+OUTPUT_FORMATS = ("csv", "parquet", "both")
+DEFAULT_WORKERS = 1
+# Колонок за одну передачу в процесс: меньше накладных расходов на обмен.
+WORKER_CHUNK_COLUMNS = 4
+# Колонки с небольшим числом различных значений: в Parquet пишем словарем.
+LOW_CARDINALITY_COLUMNS = (
+    "unifiedCountryCode / value",
+    "conformityDocKindName",
+    "technicalRegulationId",
+    "docStatusDetails / docStatusCode",
+)
+# Технические колонки, почти всегда нерелевантные для чтения.
+TECHNICAL_PREFIXES = ("_sys", "_class", "_source", "masterId.$binary", "_id.$oid")
+EMPTY_MARKERS = ["None", "nan", "NaN", "null", "[]", "{}"]
+EMPTY_TEXTS = frozenset(EMPTY_MARKERS)
+# Дата-время в UTC, как их отдает выгрузка: 2024-06-24T01:02:03.000Z.
+UTC_ISO_DATE_PATTERN = (
+    r"^\d{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12]\d|3[01])"
+    r"T(?:[01]\d|2[0-3]):[0-5]\d(?::[0-5]\d(?:\.\d+)?)?Z$"
+)
 
 
 def parse_args() -> argparse.Namespace:
@@ -25,23 +51,45 @@ def parse_args() -> argparse.Namespace:
             "(по умолчанию 0.95 = 95%% пустых)."
         ),
     )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="csv",
+        help=(
+            "Формат результата: csv, parquet (рядом с CSV, расширение .parquet) "
+            "или both (по умолчанию csv). Для Parquet нужен pyarrow."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=(
+            "Сколько процессов преобразуют колонки параллельно "
+            f"(по умолчанию {DEFAULT_WORKERS} — в текущем процессе)."
+        ),
+    )
     return parser.parse_args()
 
 
 def parse_structured_value(value: str):
     text = value.strip()
-    if not text:
-        return ""
-    if text in {"[]", "{}", "None", "nan", "NaN", "null"}:
+    if not text or text in EMPTY_TEXTS:
         return ""
 
-    if (text.startswith("[") and text.endswith("]")) or (
-        text.startswith("{") and text.endswith("}")
-    ):
+    first, last = text[0], text[-1]
+    if (first == "[" and last == "]") or (first == "{" and last == "}"):
         try:
-            return json.loads(text)
-        except json.JSONDecodeError:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
             pass
+        # Python-repr из выгрузки обычно отличается от JSON только кавычками;
+        # None/True/False и апострофы внутри значений остаются для ast.
+        if "'" in text:
+            try:
+                return orjson.loads(text.replace("'", '"'))
+            except orjson.JSONDecodeError:
+                pass
         try:
             return ast.literal_eval(text)
         except (ValueError, SyntaxError):
@@ -54,32 +102,120 @@ def compact_scalar(value) -> str:
     if value is None:
         return ""
     text = str(value).strip()
-    if text in {"None", "nan", "NaN", "null", "[]", "{}"}:
-        return ""
-    return text
+    return "" if text in EMPTY_TEXTS else text
 
 
-def flatten_for_humans(value) -> str:
+def _flatten_into(value, out: list) -> None:
+    # Все части пишутся в один общий список; разделитель перед пустой частью
+    # откатывается, поэтому результат совпадает с join по непустым частям.
     if isinstance(value, list):
-        if not value:
-            return ""
-        parts = [flatten_for_humans(item) for item in value]
-        parts = [p for p in parts if p]
-        return " | ".join(parts)
+        separated = False
+        for item in value:
+            mark = len(out)
+            if separated:
+                out.append(" | ")
+            start = len(out)
+            _flatten_into(item, out)
+            if len(out) == start:
+                del out[mark:]
+            else:
+                separated = True
+        return
     if isinstance(value, dict):
-        pairs = []
+        separated = False
         for key, raw in value.items():
-            flat = flatten_for_humans(raw)
-            if flat:
-                pairs.append(f"{key}: {flat}")
-        return "; ".join(pairs)
-    return compact_scalar(value)
+            mark = len(out)
+            if separated:
+                out.append("; ")
+            out.append(str(key))
+            out.append(": ")
+            start = len(out)
+            _flatten_into(raw, out)
+            if len(out) == start:
+                del out[mark:]
+            else:
+                separated = True
+        return
+    text = compact_scalar(value)
+    if text:
+        out.append(text)
+
+
+def flatten_for_humans(value) -> str:
+    # Один join на значение вместо промежуточной строки на каждый уровень.
+    out: list = []
+    _flatten_into(value, out)
+    return "".join(out)
+
+
+def readable_column(series: pd.Series) -> pd.Series:
+    # Поячеечный разбор нужен только значениям вида [...] или {...}; обычные
+    # строки чистятся векторными операциями без вызова Python-функций.
+    stripped = series.fillna("").str.strip()
+    structured = (stripped.str.startswith("[") & stripped.str.endswith("]")) | (
+        stripped.str.startswith("{") & stripped.str.endswith("}")
+    )
+    result = stripped.mask(stripped.isin(EMPTY_MARKERS), "")
+    if structured.any():
+        values = stripped[structured]
+        # Значения сильно повторяются (коды регламентов, изготовители), поэтому
+        # разбираем каждое уникальное значение один раз.
+        readable = {
+            value: flatten_for_humans(parse_structured_value(value))
+            for value in values.unique()
+        }
+        result[structured] = values.map(readable)
+    return result
+
+
+def raw_empty_share(series: pd.Series) -> float:
+    stripped = series.str.strip()
+    return float(((stripped == "") | stripped.isin(EMPTY_MARKERS)).mean())
 
 
 def looks_like_iso_date_column(column: str) -> bool:
     return column.endswith(".$date")
 
 
+def readable_date_column(series: pd.Series) -> pd.Series:
+    # Если все непустые значения уже в UTC с суффиксом Z, нужный формат — просто
+    # первые 16 символов строки: срез без разбора в datetime и обратно.
+    filled = series != ""
+    if filled.any() and series[filled].str.match(UTC_ISO_DATE_PATTERN).all():
+        return (series.str.slice(0, 10) + " " + series.str.slice(11, 16)).where(filled, "")
+
+    # format="ISO8601": формат не угадывается по первой строке, поэтому
+    # значения с миллисекундами и без них разбираются одинаково.
+    parsed = pd.to_datetime(series, errors="coerce", utc=True, format="ISO8601")
+    # Формат без секунды для компактности, если есть валидные даты.
+    if parsed.notna().any():
+        return parsed.dt.strftime("%Y-%m-%d %H:%M").fillna("")
+    return series
+
+
+def transform_column(column: str, series: pd.Series) -> pd.Series:
+    series = readable_column(series)
+    if looks_like_iso_date_column(column):
+        series = readable_date_column(series)
+    return series
+
+
+def transform_columns(df: pd.DataFrame, workers: int) -> None:
+    columns = list(df.columns)
+    if workers <= 1 or len(columns) <= 1:
+        for col in columns:
+            df[col] = transform_column(col, df[col])
+        return
+
+    # Колонки независимы, а разбор в flatten_for_humans упирается в GIL, поэтому
+    # колонки преобразуются в отдельных процессах; индекс фрейма туда не уходит.
+    series_list = [df[col].reset_index(drop=True) for col in columns]
+    with ProcessPoolExecutor(max_workers=min(workers, len(columns))) as pool:
+        results = pool.map(transform_column, columns, series_list, chunksize=WORKER_CHUNK_COLUMNS)
+        for col, series in zip(columns, results):
+            df[col] = series.set_axis(df.index)
+
+
 def human_column_name(column: str) -> str:
     name = column.replace(".$date", " date")
     name = name.replace(".", " / ")
@@ -90,8 +226,42 @@ def default_output_path(input_path: Path) -> Path:
     return input_path.with_name(f"{input_path.stem}_readable{input_path.suffix}")
 
 
+def read_csv(input_path: Path) -> pd.DataFrame:
+    # Arrow разбирает блоки файла в несколько потоков. Все колонки читаем как
+    # строки, пустые ячейки остаются "" — маркеры пустоты чистит readable_column.
+    with input_path.open("r", newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f, delimiter=";"), [])
+    table = pa_csv.read_csv(
+        input_path,
+        parse_options=pa_csv.ParseOptions(delimiter=";", newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={c: pa.string() for c in header},
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+    # Строки остаются в Arrow: компактнее в памяти, чем объекты str в object-колонках.
+    return table.to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get)
+
+
+def write_csv(df: pd.DataFrame, output_path: Path) -> None:
+    # CSV пишет Arrow из своей памяти на C, без построчной сериализации pandas.
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with output_path.open("wb") as f:
+        # BOM, как у utf-8-sig: Excel иначе не распознает кодировку.
+        f.write(codecs.BOM_UTF8)
+        pa_csv.write_csv(table, f, write_options=pa_csv.WriteOptions(delimiter=";"))
+
+
+def write_parquet(df: pd.DataFrame, output_path: Path) -> None:
+    categorical = {c: "category" for c in LOW_CARDINALITY_COLUMNS if c in df.columns}
+    df.astype(categorical).to_parquet(output_path, index=False, compression="zstd")
+
+
 def main() -> None:
     args = parse_args()
+    if args.workers <= 0:
+        raise ValueError("--workers должен быть больше 0.")
 
     input_path = Path(args.input).expanduser().resolve()
     output_path = (
@@ -100,34 +270,22 @@ def main() -> None:
         else default_output_path(input_path)
     )
 
-    df = pd.read_csv(input_path, sep=";", dtype=str)
-
-    for col in df.columns:
-        df[col] = df[col].fillna("").map(parse_structured_value).map(flatten_for_humans)
-
-        if looks_like_iso_date_column(col):
-            parsed = pd.to_datetime(df[col], errors="coerce", utc=True)
-            # Формат без секунды для компактности, если есть валидные даты.
-            if parsed.notna().any():
-                df[col] = parsed.dt.strftime("%Y-%m-%d %H:%M").fillna("")
+    df = read_csv(input_path)
 
-    # Убираем технические колонки почти всегда нерелевантные для чтения.
-    technical_prefixes = ("_sys", "_class", "_source", "masterId.$binary", "_id.$oid")
-    keep_cols = [
-        c
-        for c in df.columns
-        if not any(c.startswith(prefix) for prefix in technical_prefixes)
-    ]
+    # Технические колонки и колонки, пустые уже в исходном виде, отбрасываем до
+    # поячеечного разбора: преобразование не делает пустое значение непустым.
+    keep_cols = [c for c in df.columns if not c.startswith(TECHNICAL_PREFIXES)]
+    if len(df):
+        keep_cols = [c for c in keep_cols if raw_empty_share(df[c]) < args.drop_empty_threshold]
     df = df[keep_cols]
 
-    # Удаляем колонки, где слишком много пустых значений.
-    empty_share = (df == "").sum() / len(df) if len(df) else 0
-    drop_cols = [c for c in df.columns if float(empty_share[c]) >= args.drop_empty_threshold]
-    if drop_cols:
-        df = df.drop(columns=drop_cols)
+    transform_columns(df, args.workers)
 
-    # Переименовываем колонки в более читаемый формат.
-    df = df.rename(columns={c: human_column_name(c) for c in df.columns})
+    # После разбора пустыми могут оказаться и структурные значения вроде
+    # [{'x': None}], поэтому долю пустых проверяем еще раз. Доля считается по
+    # одной колонке за раз, без булевого фрейма размером со всю таблицу.
+    if len(df):
+        keep_cols = [c for c in keep_cols if float((df[c] == "").mean()) < args.drop_empty_threshold]
 
     # Полезные колонки ставим в начало, если они есть.
     preferred = [
@@ -139,13 +297,26 @@ def main() -> None:
         "docValidityDate date",
         "applicantDetails / businessEntityName",
     ]
-    first = [c for c in preferred if c in df.columns]
-    other = [c for c in df.columns if c not in first]
+    # Человекочитаемое имя каждой колонки считается один раз и нужно и для
+    # порядка, и для заголовков.
+    human_names = {c: human_column_name(c) for c in keep_cols}
+    by_human_name = {name: c for c, name in human_names.items()}
+    first = [by_human_name[name] for name in preferred if name in by_human_name]
+    other = [c for c in keep_cols if c not in first]
+
+    # Отбор и порядок колонок — одна выборка из исходного фрейма вместо цепочки
+    # копий; переименование меняет только заголовки.
     df = df[first + other]
+    df.columns = [human_names[c] for c in df.columns]
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(output_path, sep=";", index=False, encoding="utf-8-sig")
-    print(f"Готово: {output_path}")
+    if args.format in {"csv", "both"}:
+        write_csv(df, output_path)
+        print(f"Готово: {output_path}")
+    if args.format in {"parquet", "both"}:
+        parquet_path = output_path.with_suffix(".parquet")
+        write_parquet(df, parquet_path)
+        print(f"Готово: {parquet_path}")
     print(f"Строк: {len(df)} | Колонок: {len(df.columns)}")
 
 
@@ -3,6 +3,9 @@ import glob
 import os
 import re
 
+PART_FILE_RE = re.compile(r"_part(\d+)\.csv$", flags=re.IGNORECASE)
+COPY_BUFFER_BYTES = 1024 * 1024
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -23,14 +26,28 @@ def parse_args() -> argparse.Namespace:
 
 def part_sort_key(path: str) -> tuple[str, int]:
     name = os.path.basename(path)
-    match = re.search(r"_part(\d+)\.csv$", name, flags=re.IGNORECASE)
+    match = PART_FILE_RE.search(name)
     if match:
-        return (re.sub(r"_part\d+\.csv$", "", name, flags=re.IGNORECASE), int(match.group(1)))
+        return (name[: match.start()], int(match.group(1)))
     if name.lower().endswith(".csv"):
         return (name[:-4], 1)
     return (name, 1)
 
 
+def copy_counting_lines(src, out) -> int:
+    # Копируем крупными блоками без разбора на строки; переводы строк считаются
+    # в C через bytes.count. Последняя строка без \n тоже считается строкой.
+    lines = 0
+    last = b"\n"
+    while chunk := src.read(COPY_BUFFER_BYTES):
+        out.write(chunk)
+        lines += chunk.count(b"\n")
+        last = chunk[-1:]
+    if last != b"\n":
+        lines += 1
+    return lines
+
+
 def merge_csv(files: list[str], output_path: str) -> None:
     if not files:
         raise ValueError("Не найдено файлов для склейки.")
@@ -44,18 +61,11 @@ def merge_csv(files: list[str], output_path: str) -> None:
     with open(output_path, "wb") as out:
         for i, path in enumerate(sorted_files):
             with open(path, "rb") as src:
+                header = src.readline()
                 if i == 0:
-                    for line_no, line in enumerate(src):
-                        out.write(line)
-                        if line_no > 0:
-                            total_rows += 1
-                    continue
-
-                # В остальных файлах пропускаем первую строку (заголовок).
-                _ = src.readline()
-                for line in src:
-                    out.write(line)
-                    total_rows += 1
+                    out.write(header)
+                # В остальных файлах первую строку (заголовок) пропускаем.
+                total_rows += copy_counting_lines(src, out)
 
     print(f"\nГотово: {output_path}")
     print(f"Строк данных (без заголовка): {total_rows}")
@@ -0,0 +1,100 @@
+import csv
+import gzip
+import io
+import os
+import tempfile
+import unittest
+
+from rest_api_eaeu.download_eaeu_odata_csv import CsvPartWriter, escape_csv_field
+
+
+class EscapeCsvFieldTests(unittest.TestCase):
+    def test_plain_value_is_not_quoted(self) -> None:
+        self.assertEqual(escape_csv_field("ТР ТС 004/2011"), "ТР ТС 004/2011")
+
+    def test_empty_value_is_not_quoted(self) -> None:
+        self.assertEqual(escape_csv_field(""), "")
+
+    def test_quotes_delimiter_quote_and_newlines(self) -> None:
+        self.assertEqual(escape_csv_field("a;b"), '"a;b"')
+        self.assertEqual(escape_csv_field('say "hi"'), '"say ""hi"""')
+        self.assertEqual(escape_csv_field("a\nb"), '"a\nb"')
+        self.assertEqual(escape_csv_field("a\rb"), '"a\rb"')
+
+
+class CsvPartWriterTests(unittest.TestCase):
+    FIELDNAMES = ["a", "b"]
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.filename = os.path.join(self._tmp.name, "export.csv")
+
+    def _expected(self, rows: list[list[str]]) -> str:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=";")
+        writer.writerow(self.FIELDNAMES)
+        writer.writerows(rows)
+        return buffer.getvalue()
+
+    def _read(self, path: str) -> str:
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            return f.read()
+
+    def test_output_matches_csv_writer(self) -> None:
+        rows = [
+            ["1", 'x;"y"'],
+            ["прив", ""],
+            ["q\nw", "z"],
+            ["a;b", "c"],
+        ]
+        writer = CsvPartWriter(self.filename, 10, self.FIELDNAMES)
+        writer.write_rows(rows)
+        writer.close()
+
+        self.assertEqual(writer.files_created, [self.filename])
+        self.assertEqual(self._read(self.filename), self._expected(rows))
+
+    def test_rotates_parts_at_max_rows(self) -> None:
+        rows = [[str(i), "v"] for i in range(5)]
+        writer = CsvPartWriter(self.filename, 2, self.FIELDNAMES)
+        writer.write_rows(rows[:3])
+        writer.write_row(rows[3])
+        writer.write_rows(rows[4:])
+        writer.close()
+
+        self.assertEqual(writer.total_rows, 5)
+        self.assertEqual(
+            [os.path.basename(path) for path in writer.files_created],
+            ["export.csv", "export_part002.csv", "export_part003.csv"],
+        )
+        parts = [self._read(path) for path in writer.files_created]
+        self.assertEqual(parts[0], self._expected(rows[0:2]))
+        self.assertEqual(parts[1], self._expected(rows[2:4]))
+        self.assertEqual(parts[2], self._expected(rows[4:5]))
+
+    def test_sync_puts_buffered_rows_on_disk(self) -> None:
+        rows = [["1", "a"], ["2", "b"]]
+        writer = CsvPartWriter(self.filename, 10, self.FIELDNAMES)
+        self.addCleanup(writer.close)
+        writer.write_rows(rows)
+        writer.sync()
+
+        self.assertEqual(self._read(self.filename), self._expected(rows))
+
+    def test_gzip_parts_decompress_to_plain_csv(self) -> None:
+        rows = [[str(i), "v;w"] for i in range(3)]
+        writer = CsvPartWriter(self.filename, 2, self.FIELDNAMES, compress="gzip")
+        writer.write_rows(rows)
+        writer.close()
+
+        self.assertEqual(
+            [os.path.basename(path) for path in writer.files_created],
+            ["export.csv.gz", "export_part002.csv.gz"],
+        )
+        with gzip.open(writer.files_created[0], "rt", newline="", encoding="utf-8-sig") as f:
+            self.assertEqual(f.read(), self._expected(rows[0:2]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import requests
+
+from rest_api_eaeu import download_eaeu_archives
+
+
+def make_archive(records: list[dict]) -> bytes:
+    return gzip.compress(json.dumps({"result": records}, ensure_ascii=False).encode("utf-8"))
+
+
+def make_record(doc_id: str, country: str) -> dict:
+    return {
+        "docId": doc_id,
+        "unifiedCountryCode": {"value": country},
+        "docStatusDetails": {"docStatusCode": "01"},
+    }
+
+
+class FakeResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def raise_for_status(self) -> None:
+        pass
+
+
+class FakeSession:
+    def __init__(self, files: dict[str, bytes]):
+        self.files = files
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def get(self, url: str, timeout: float):
+        if url == download_eaeu_archives.INDEX_URL:
+            links = "".join(f'<a href="{name}">{name}</a>' for name in self.files)
+            return FakeResponse(links.encode())
+        body = self.files[url.rsplit("/", 1)[-1]]
+        if body is None:
+            raise requests.ConnectionError("обрыв соединения")
+        return FakeResponse(body)
+
+
+class ProcessArchivesTests(unittest.TestCase):
+    def test_pipeline_writes_target_rows_from_all_archives(self) -> None:
+        files = {
+            "a.json.gz": make_archive([make_record("A1", "KG"), make_record("B1", "RU")]),
+            "b.json.gz": None,
+            "c.json.gz": make_archive([make_record("C1", "BY")]),
+            "d.json.gz": make_archive([make_record("D1", "KG"), make_record("D2", "KG")]),
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "export.csv")
+            with mock.patch.object(download_eaeu_archives, "OUTPUT_FILE", output), mock.patch.object(
+                download_eaeu_archives, "create_http_session", return_value=FakeSession(files)
+            ), self.assertLogs("archive_processor", level="ERROR") as logs:
+                download_eaeu_archives.process_archives()
+
+            with open(output, "r", encoding="utf-8-sig") as f:
+                lines = f.read().splitlines()
+
+        self.assertEqual(lines[0].split(";"), download_eaeu_archives.OUTPUT_COLUMNS)
+        self.assertEqual(sorted(line.split(";")[0] for line in lines[1:]), ["A1", "D1", "D2"])
+        self.assertTrue(any("b.json.gz" in message for message in logs.output))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import gzip
+import json
+import unittest
+from unittest import mock
+
+from rest_api_eaeu.download_eaeu_archives import rows_from_archive
+
+
+def make_archive(records: list[dict], wrapped: bool = True) -> bytes:
+    payload = {"result": records} if wrapped else records
+    return gzip.compress(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+
+def make_record(doc_id: str, country: str) -> dict:
+    return {
+        "docId": doc_id,
+        "unifiedCountryCode": {"value": country},
+        "docStatusDetails": {"docStatusCode": "01"},
+    }
+
+
+class RowsFromArchiveTests(unittest.TestCase):
+    def test_keeps_only_target_country_records(self) -> None:
+        body = make_archive([make_record("A1", "KG"), make_record("B2", "RU"), make_record("C3", "KG")])
+        rows = rows_from_archive(body)
+        self.assertEqual([row[0] for row in rows], ["A1", "C3"])
+        self.assertEqual({row[1] for row in rows}, {"Кыргызстан"})
+
+    def test_reads_archive_with_bare_array_root(self) -> None:
+        body = make_archive([make_record("A1", "KG")], wrapped=False)
+        self.assertEqual([row[0] for row in rows_from_archive(body)], ["A1"])
+
+    def test_archive_without_country_gives_no_rows(self) -> None:
+        body = make_archive([make_record("B2", "RU"), make_record("D4", "BY")])
+        self.assertEqual(rows_from_archive(body), [])
+
+    def test_archive_is_streamed_without_full_decompression(self) -> None:
+        body = make_archive([make_record("A1", "KG"), make_record("B2", "RU")])
+        with mock.patch.object(gzip, "decompress", side_effect=AssertionError("полная распаковка")):
+            self.assertEqual([row[0] for row in rows_from_archive(body)], ["A1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import threading
+import unittest
+
+import orjson
+
+from rest_api_eaeu.download_eaeu_odata_csv import StateWriter
+
+
+class StateWriterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = os.path.join(self._tmp.name, "state.json")
+
+    def test_syncs_data_before_writing_state(self) -> None:
+        synced_before_write = []
+
+        def sync_data() -> None:
+            synced_before_write.append(not os.path.exists(self.path))
+
+        writer = StateWriter(self.path, flush_every=1, sync_data=sync_data)
+        writer.submit({"countries": {"KG|all": {"next_skip": 10}}})
+        writer.flush_and_join()
+
+        self.assertEqual(synced_before_write[:1], [True])
+        with open(self.path, "rb") as f:
+            self.assertEqual(orjson.loads(f.read())["countries"]["KG|all"]["next_skip"], 10)
+
+    def test_sync_error_keeps_previous_state(self) -> None:
+        def sync_data() -> None:
+            raise OSError("диск недоступен")
+
+        writer = StateWriter(self.path, flush_every=1, sync_data=sync_data)
+        writer.submit({"countries": {}})
+        with self.assertRaises(RuntimeError):
+            writer.flush_and_join()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_worker_failure_is_reported_instead_of_hanging(self) -> None:
+        entered = threading.Event()
+        release = threading.Event()
+
+        def sync_data() -> None:
+            # Не OSError: такую ошибку _save не перехватывает, и поток падает.
+            entered.set()
+            release.wait(timeout=5)
+            raise ValueError("сбой синхронизации")
+
+        writer = StateWriter(self.path, flush_every=1, sync_data=sync_data)
+        writer.submit({"countries": {"KG|all": {"next_skip": 1}}})
+        self.assertTrue(entered.wait(timeout=5))
+        # Этот снимок остается в очереди: разбирать ее после падения некому.
+        writer.submit({"countries": {"KG|all": {"next_skip": 2}}})
+        release.set()
+
+        done = threading.Event()
+        errors = []
+
+        def finish() -> None:
+            try:
+                writer.flush_and_join()
+            except RuntimeError as exc:
+                errors.append(exc)
+            done.set()
+
+        threading.Thread(target=finish, daemon=True).start()
+        self.assertTrue(done.wait(timeout=5))
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0].__cause__, ValueError)
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from rest_api_eaeu.download_eaeu_odata_csv import sum_until_first_error
+
+
+class SumUntilFirstErrorTests(unittest.TestCase):
+    def test_sums_results_when_all_succeed(self) -> None:
+        stop_event = threading.Event()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(lambda n=n: n) for n in (2, 3)]
+            self.assertEqual(sum_until_first_error(futures, stop_event), 5)
+        self.assertFalse(stop_event.is_set())
+
+    def test_error_in_second_slice_stops_first_slice(self) -> None:
+        stop_event = threading.Event()
+        first_stopped = threading.Event()
+
+        def long_slice() -> int:
+            # Без stop_event интервал шел бы дольше всего теста.
+            if stop_event.wait(timeout=10):
+                first_stopped.set()
+            return 1
+
+        def failing_slice() -> int:
+            raise RuntimeError("сбой интервала")
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(long_slice), pool.submit(failing_slice)]
+            with self.assertRaisesRegex(RuntimeError, "сбой интервала"):
+                sum_until_first_error(futures, stop_event)
+
+        self.assertTrue(stop_event.is_set())
+        self.assertTrue(first_stopped.is_set())
+        self.assertLess(time.monotonic() - started, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()